@@ -0,0 +1,98 @@
+"""
+GitHub CLI credentials for the migration scripts
+
+Reads gh's token from the environment or hosts.yml instead of exec'ing
+`gh auth status` (a Go binary, ~150 ms cold). Falls back to the CLI only
+when the file can't answer, e.g. when gh keeps the token in the system
+keyring.
+"""
+
+import functools
+import os
+import subprocess
+from pathlib import Path
+from typing import Optional
+
+from _gh_batch import GH
+
+HOST = "github.com"
+
+
+def _hosts_file() -> Path:
+    """Location of gh's hosts.yml (honours GH_CONFIG_DIR / XDG_CONFIG_HOME)"""
+    config_dir = os.environ.get("GH_CONFIG_DIR")
+    if not config_dir:
+        xdg = os.environ.get("XDG_CONFIG_HOME") or os.path.expanduser("~/.config")
+        config_dir = os.path.join(xdg, "gh")
+    return Path(config_dir) / "hosts.yml"
+
+
+def _token_from_hosts_file() -> Optional[str]:
+    """
+    Plain-text oauth_token of the active github.com account in hosts.yml
+
+    With several accounts logged in, gh lists each under `users:` and
+    names the active one in `user:`; other accounts' tokens are never
+    returned. None when the active token isn't in the file.
+    """
+    hosts = _hosts_file()
+    if not hosts.exists():
+        return None
+
+    host = None
+    host_indent = None  # indentation of the host's own keys
+    in_users = False
+    account = None
+    active_user = active_token = None
+    user_tokens = {}
+    for line in hosts.read_text(encoding='utf-8').splitlines():
+        if not line.strip() or line.lstrip().startswith('#'):
+            continue
+        indent = len(line) - len(line.lstrip())
+        if not indent:
+            # Top-level keys are host names
+            host = line.rstrip().rstrip(':')
+            host_indent = None
+            continue
+        if host != HOST:
+            continue
+
+        key, _, value = line.strip().partition(':')
+        value = value.strip()
+        if host_indent is None:
+            host_indent = indent
+        if indent == host_indent:
+            in_users = key == "users"
+            if key == "user":
+                active_user = value
+            elif key == "oauth_token" and value:
+                active_token = value
+        elif in_users:
+            if not value:
+                account = key  # a login under users:
+            elif key == "oauth_token" and account:
+                user_tokens[account] = value
+
+    return active_token or user_tokens.get(active_user)
+
+
+@functools.lru_cache(maxsize=1)
+def github_token() -> Optional[str]:
+    """Token gh would use for github.com, resolved once per process"""
+    token = os.environ.get("GH_TOKEN") or os.environ.get("GITHUB_TOKEN") or _token_from_hosts_file()
+    if token:
+        return token
+
+    # Token lives in the system keyring: only gh itself can read it
+    try:
+        result = subprocess.run([GH, 'auth', 'token', '--hostname', HOST], capture_output=True, text=True)
+        if result.returncode == 0 and result.stdout.strip():
+            return result.stdout.strip()
+    except Exception:
+        pass
+    return None
+
+
+def is_authenticated() -> bool:
+    """True if gh has credentials for github.com (checked once per process)"""
+    return github_token() is not None
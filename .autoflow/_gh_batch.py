@@ -0,0 +1,104 @@
+"""
+Batched GitHub issue creation for the Archon migration scripts
+
+Creates any number of issues with ONE `gh api graphql` call (aliased
+createIssue mutations) instead of one `gh issue create` per project.
+"""
+
+import json
+import shutil
+import subprocess
+from typing import Any, Dict, List, Optional, Tuple
+
+GH = shutil.which('gh') or 'gh'
+AUTOFLOW_DIR = "/Users/samiullah/AutoFlow"
+
+
+def _graphql(query: str, cwd: str, variables: Dict[str, str], current_repo: bool = False,
+             jq: Optional[str] = None) -> Optional[Any]:
+    """
+    Run one `gh api graphql` call
+
+    The query and variables go to gh as a JSON request body on stdin
+    (--input -), so large batches never run into the argv size limit.
+    current_repo instead passes the query plus $owner/$repo as fields:
+    gh only expands its {owner}/{repo} placeholders in fields, so use it
+    for small lookups only. jq is applied by gh itself, so only the
+    filtered JSON crosses the pipe.
+    """
+    cmd = [GH, 'api', 'graphql']
+    stdin = None
+    if current_repo:
+        cmd.extend(['-f', f'query={query}', '-F', 'owner={owner}', '-F', 'repo={repo}'])
+        for name, value in variables.items():
+            # -f passes text verbatim (no @file or placeholder expansion)
+            cmd.extend(['-f', f'{name}={value}'])
+    else:
+        cmd.extend(['--input', '-'])
+        stdin = json.dumps({"query": query, "variables": variables})
+    if jq:
+        cmd.extend(['--jq', jq])
+
+    try:
+        result = subprocess.run(cmd, input=stdin, capture_output=True, text=True, cwd=cwd)
+        if result.returncode != 0 and not result.stdout:
+            print(f"⚠️  GitHub GraphQL error: {result.stderr.strip()}")
+            return None
+        return json.loads(result.stdout)
+    except Exception as e:
+        print(f"⚠️  Error: {e}")
+        return None
+
+
+def _repository(cwd: str) -> Tuple[Optional[str], Dict[str, str]]:
+    """Repository node ID and label name → ID map, in one query"""
+    query = """query($owner: String!, $repo: String!) {
+  repository(owner: $owner, name: $repo) {
+    id
+    labels(first: 100) { nodes { id name } }
+  }
+}"""
+    jq = '.data.repository // {} | {id, labels: [.labels.nodes[]? | {(.name): .id}] | add}'
+    repo = _graphql(query, cwd, {}, current_repo=True, jq=jq) or {}
+    if not repo.get("id"):
+        return None, {}
+    return repo["id"], repo["labels"] or {}
+
+
+def bulk_create_issues(issues: List[Dict], cwd: str = AUTOFLOW_DIR) -> List[Optional[str]]:
+    """
+    Create issues (dicts with title/body/labels) in a single GraphQL request
+
+    Returns the issue URLs in input order, None where creation failed.
+    Labels that do not exist in the repository are skipped.
+    """
+    if not issues:
+        return []
+
+    repo_id, label_ids = _repository(cwd)
+    if not repo_id:
+        return [None] * len(issues)
+
+    params = ["$r: ID!"]
+    mutations = []
+    variables = {"r": repo_id}
+    for i, issue in enumerate(issues):
+        labels = json.dumps([label_ids[name] for name in issue["labels"] if name in label_ids])
+        params.append(f"$t{i}: String!, $b{i}: String")
+        mutations.append(
+            f"i{i}: createIssue(input: {{repositoryId: $r, title: $t{i}, body: $b{i}, labelIds: {labels}}}) "
+            f"{{ issue {{ url number }} }}"
+        )
+        variables[f"t{i}"] = issue["title"]
+        variables[f"b{i}"] = issue["body"]
+
+    query = f"mutation({', '.join(params)}) {{\n  " + "\n  ".join(mutations) + "\n}"
+    # Reduce the response to {errors: [message], urls: {alias: url}} inside gh
+    jq = '{errors: [.errors[]?.message], urls: (.data // {} | map_values(.issue.url?))}'
+    response = _graphql(query, cwd, variables, jq=jq) or {}
+
+    for message in response.get("errors", []):
+        print(f"⚠️  Failed: {message}")
+
+    urls = response.get("urls") or {}
+    return [urls.get(f"i{i}") for i in range(len(issues))]
@@ -0,0 +1,153 @@
+"""
+Keep-alive GitHub REST client for the migration scripts
+
+Uses the token gh already has (see _gh_auth) and talks to the API over
+pooled HTTPS connections, so creating N issues costs one TLS handshake
+per worker thread instead of one `gh` process (Go runtime start-up plus
+its own handshake) per issue.
+"""
+
+import functools
+import http.client
+import json
+import queue
+import re
+import subprocess
+import threading
+import time
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+from _gh_auth import github_token
+
+API_HOST = "api.github.com"
+
+
+class TokenBucket:
+    """Thread-safe token bucket: acquire() blocks until a token is available"""
+
+    def __init__(self, rate: float, capacity: int):
+        self.rate = rate  # tokens per second
+        self.capacity = capacity
+        self._tokens = float(capacity)
+        self._updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def acquire(self):
+        with self._lock:
+            now = time.monotonic()
+            self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self.rate)
+            self._updated = now
+            # Reserve a token now (possibly going negative) and sleep off the debt
+            self._tokens -= 1
+            wait = -self._tokens / self.rate if self._tokens < 0 else 0.0
+        if wait:
+            time.sleep(wait)
+
+
+# GitHub's secondary rate limit allows ~80 content-creating requests per
+# minute; stay under it however many threads are creating issues
+ISSUE_CREATION_LIMIT = TokenBucket(rate=80 / 60, capacity=10)
+
+
+@functools.lru_cache(maxsize=None)
+def current_repo(cwd: Optional[str] = None) -> Optional[str]:
+    """owner/repo of the origin remote in cwd (what gh would target)"""
+    try:
+        result = subprocess.run(['git', 'config', '--get', 'remote.origin.url'],
+                                capture_output=True, text=True, cwd=cwd)
+    except OSError:
+        return None
+    match = re.search(r'github\.com[:/]([^/]+/[^/]+?)(?:\.git)?/?$', result.stdout.strip())
+    return match.group(1) if match else None
+
+
+class GitHubClient:
+    """Thread-safe GitHub REST client backed by a small connection pool"""
+
+    POOL_SIZE = 10
+    # A POST is not safe to replay once sent, so it only retries failures
+    # before the request went out, and gets a fresh connection instead of
+    # one that sat idle long enough for the server to have dropped it
+    IDEMPOTENT_METHODS = frozenset({'GET', 'HEAD', 'PUT', 'DELETE'})
+    MAX_IDLE_REUSE = 5.0  # seconds
+
+    def __init__(self, token: str):
+        self.token = token
+        # (connection, last used at), most recently used on top
+        self._pool: "queue.LifoQueue[Tuple[http.client.HTTPSConnection, float]]" = queue.LifoQueue(self.POOL_SIZE)
+
+    def create_issue(self, repo: str, title: str, body: str, labels: List[str],
+                     log: Callable[[str], None] = print) -> Optional[str]:
+        """Create an issue in owner/repo, returning its URL (failures are reported via log)"""
+        ISSUE_CREATION_LIMIT.acquire()
+        status, data = self.request('POST', f'/repos/{repo}/issues', {
+            "title": title,
+            "body": body,
+            "labels": labels
+        }, log=log)
+        if status == 201:
+            return data["html_url"]
+        message = (data or {}).get("message") if isinstance(data, dict) else None
+        log(f"⚠️  Failed: HTTP {status} {message or ''}".rstrip())
+        return None
+
+    def request(self, method: str, path: str, payload: Optional[Dict] = None,
+                log: Callable[[str], None] = print) -> Tuple[int, Any]:
+        """One API call on a pooled connection, returning (status, json)"""
+        headers = {
+            "Authorization": f"Bearer {self.token}",
+            "Accept": "application/vnd.github+json",
+            "User-Agent": "autoflow-migrate",
+        }
+        body = None
+        if payload is not None:
+            body = json.dumps(payload).encode('utf-8')
+            headers["Content-Type"] = "application/json"
+
+        idempotent = method in self.IDEMPOTENT_METHODS
+        for attempt in range(2):
+            conn = self._acquire(max_idle=None if idempotent else self.MAX_IDLE_REUSE)
+            sent = False
+            try:
+                conn.request(method, path, body=body, headers=headers)
+                sent = True
+                response = conn.getresponse()
+                raw = response.read()
+            except (http.client.HTTPException, OSError) as e:
+                # Stale keep-alive connection: retry once on a fresh one, unless
+                # a POST already went out (it may have created the issue)
+                conn.close()
+                if attempt or (sent and not idempotent):
+                    log(f"⚠️  GitHub API error: {e}")
+                    return 0, None
+                continue
+            self._release(conn)
+            try:
+                return response.status, json.loads(raw) if raw else None
+            except ValueError:
+                # HTML error page from GitHub or a proxy: keep the status, drop the body
+                return response.status, None
+        return 0, None
+
+    def _acquire(self, max_idle: Optional[float] = None) -> http.client.HTTPSConnection:
+        try:
+            conn, used_at = self._pool.get_nowait()
+        except queue.Empty:
+            return http.client.HTTPSConnection(API_HOST, timeout=30)
+        if max_idle is not None and time.monotonic() - used_at > max_idle:
+            conn.close()
+            return http.client.HTTPSConnection(API_HOST, timeout=30)
+        return conn
+
+    def _release(self, conn: http.client.HTTPSConnection):
+        try:
+            self._pool.put_nowait((conn, time.monotonic()))
+        except queue.Full:
+            conn.close()
+
+
+@functools.lru_cache(maxsize=1)
+def get_client() -> Optional[GitHubClient]:
+    """Shared client, or None when no token is available (callers fall back to gh)"""
+    token = github_token()
+    return GitHubClient(token) if token else None
@@ -0,0 +1,124 @@
+"""
+Minimal MCP client over stdio for the migration scripts
+
+MCP is JSON-RPC 2.0: one message per line on the server's stdin/stdout.
+Talking to the server directly makes tool calls plain RPCs, with no LLM
+inference in between and no SDK to install.
+"""
+
+import json
+import shlex
+import subprocess
+from typing import Any, Dict, List, Optional
+
+PROTOCOL_VERSION = "2024-11-05"
+
+
+class MCPError(Exception):
+    """The server could not be reached or returned a JSON-RPC error"""
+
+
+class MCPStdioClient:
+    """
+    One session with an MCP server spawned as a subprocess
+
+    Use as a context manager: the initialize handshake runs on entry, so
+    several call_tool() calls share it.
+    """
+
+    def __init__(self, command: str):
+        self.command = shlex.split(command)
+        self._process: Optional[subprocess.Popen] = None
+        self._next_id = 0
+
+    def __enter__(self) -> "MCPStdioClient":
+        try:
+            self._process = subprocess.Popen(
+                self.command,
+                stdin=subprocess.PIPE,
+                stdout=subprocess.PIPE,
+                stderr=subprocess.DEVNULL,
+                text=True,
+                encoding='utf-8',
+                bufsize=1
+            )
+        except OSError as e:
+            raise MCPError(f"could not start {self.command[0]}: {e}") from e
+
+        try:
+            self._call("initialize", {
+                "protocolVersion": PROTOCOL_VERSION,
+                "capabilities": {},
+                "clientInfo": {"name": "autoflow-migrate", "version": "1.0"}
+            })
+            self._send({"jsonrpc": "2.0", "method": "notifications/initialized"})
+        except BaseException:
+            # __exit__ won't run when __enter__ raises: don't leak the server
+            self._process.terminate()
+            try:
+                self._process.wait(timeout=5)
+            except subprocess.TimeoutExpired:
+                self._process.kill()
+                self._process.wait()
+            raise
+        return self
+
+    def __exit__(self, *exc_info):
+        if self._process is None:
+            return
+        self._process.stdin.close()
+        try:
+            self._process.wait(timeout=5)
+        except subprocess.TimeoutExpired:
+            self._process.kill()
+            self._process.wait()
+
+    def call_tool(self, name: str, arguments: Optional[Dict] = None) -> Any:
+        """
+        Call a tool and return its result
+
+        Prefers structuredContent; otherwise the text content, decoded as
+        JSON when it is JSON.
+        """
+        result = self._call("tools/call", {"name": name, "arguments": arguments or {}})
+        if result.get("isError"):
+            raise MCPError(f"{name} failed: {_text(result.get('content', []))}")
+        if "structuredContent" in result:
+            return result["structuredContent"]
+
+        text = _text(result.get("content", []))
+        try:
+            return json.loads(text)
+        except ValueError:
+            return text
+
+    def _call(self, method: str, params: Dict) -> Dict:
+        self._next_id += 1
+        request_id = self._next_id
+        self._send({"jsonrpc": "2.0", "id": request_id, "method": method, "params": params})
+
+        # Skip server notifications/log messages until our response arrives
+        while True:
+            line = self._process.stdout.readline()
+            if not line:
+                raise MCPError(f"server exited during {method}")
+            try:
+                message = json.loads(line)
+            except ValueError:
+                continue
+            if message.get("id") != request_id or "method" in message:
+                continue
+            if "error" in message:
+                raise MCPError(f"{method}: {message['error'].get('message', message['error'])}")
+            return message.get("result", {})
+
+    def _send(self, message: Dict):
+        try:
+            self._process.stdin.write(json.dumps(message) + "\n")
+            self._process.stdin.flush()
+        except (BrokenPipeError, OSError) as e:
+            raise MCPError(f"server closed its input: {e}") from e
+
+
+def _text(content: List[Dict]) -> str:
+    return "".join(block.get("text", "") for block in content if block.get("type") == "text")
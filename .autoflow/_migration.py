@@ -0,0 +1,208 @@
+"""
+Shared pieces of the Archon migration scripts
+
+One place for the status mapping, the issue templates and for how issues
+get created:
+a single issue goes through the pooled REST client (or `gh issue create`
+without a readable token), larger sets through one batched GraphQL call
+with per-issue retries for whatever the batch could not create.
+"""
+
+import functools
+import string
+import subprocess
+import sys
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, Dict, List, Optional
+
+from _gh_batch import AUTOFLOW_DIR, GH, bulk_create_issues
+from _github_http import ISSUE_CREATION_LIMIT, GitHubClient, current_repo, get_client
+
+# From this many issues on, one GraphQL request (plus the repository
+# lookup it needs) beats separate REST calls
+BULK_THRESHOLD = 3
+
+MIGRATION_LABELS = ["migration", "from-archon", "project-setup"]
+
+# Issues the batch could not create are retried this many at a time: one
+# worker per pooled connection, so every retry reuses a warm TLS session
+RETRY_WORKERS = GitHubClient.POOL_SIZE
+
+# Archon task status -> AutoFlow status; anything else counts as todo
+STATUS_MAP = {
+    "todo": "todo",
+    "doing": "in_progress",
+    "in_progress": "in_progress",
+    "review": "review",
+    "done": "completed"
+}
+
+
+def map_status(archon_status) -> str:
+    """Map an Archon task status to AutoFlow"""
+    return STATUS_MAP.get(str(archon_status).lower(), "todo")
+
+
+_MIGRATION_BODY = string.Template("""# Migrated from Archon
+
+**Project ID**: `$id`
+**Created**: $created
+**Updated**: $updated
+
+## Description
+$description
+
+## GitHub Repo
+$repo
+
+## Migration Status
+- [ ] Project structure created in AutoFlow
+- [ ] Tasks migrated to GitHub Issues
+- [ ] Documents migrated to `.autoflow/` directory
+- [ ] Context firewalls set up
+- [ ] Git worktrees configured
+
+## Original Archon Data
+Saved to: `.autoflow/migrations/archon-$id.json`
+
+---
+*Auto-migrated from Archon to AutoFlow*
+""")
+
+
+_TASK_BODY = string.Template("""Migrated from Archon
+
+**Original Description:**
+$description
+
+**Original Status:** $status
+**Original Assignee:** $assignee
+""")
+
+_TASK_BODY_WITH_ID = string.Template(_TASK_BODY.template + """
+**Archon Task ID:** $archon_task_id
+""")
+
+
+def migration_issue(project: Dict) -> Dict:
+    """Title/body/labels of the issue that tracks a project's migration"""
+
+    body = _MIGRATION_BODY.substitute(
+        id=project['id'],
+        created=project['created_at'],
+        updated=project['updated_at'],
+        description=project['description'],
+        repo=project.get('github_repo', 'Not set'),
+    )
+    return {"title": f"[MIGRATION] {project['title']}", "body": body, "labels": MIGRATION_LABELS}
+
+
+class BufferedLog:
+    """
+    Progress lines collected in memory and written out in one go
+
+    Callable like print(line), so worker threads can report without
+    taking the stdout lock per line; flush() emits everything at once.
+    """
+
+    def __init__(self):
+        self.lines: List[str] = []
+
+    def __call__(self, line: str):
+        self.lines.append(line)  # list.append is atomic: safe from worker threads
+
+    def flush(self):
+        if self.lines:
+            sys.stdout.write('\n'.join(self.lines) + '\n')
+            sys.stdout.flush()
+            self.lines.clear()
+
+
+def task_issue(title: str, description: str, status: str, assignee: str,
+               archon_task_id: Optional[str] = None) -> Dict:
+    """Title/body/labels of the GitHub Issue for one migrated task"""
+
+    template = _TASK_BODY_WITH_ID if archon_task_id else _TASK_BODY
+    body = template.substitute(
+        description=description,
+        status=status,
+        assignee=assignee,
+        archon_task_id=archon_task_id,
+    )
+    return {
+        "title": f"[MIGRATED] {title}",
+        "body": body,
+        "labels": ["migrated-from-archon", f"status:{status}"]
+    }
+
+
+def create_issue(issue: Dict, *, cwd: Optional[str] = None, client: Optional[GitHubClient] = None,
+                 log: Callable[[str], None] = print) -> Optional[str]:
+    """
+    Create one issue in the repository of cwd, returning its URL
+
+    Goes through the pooled REST client when gh's token is readable and
+    `gh issue create` otherwise; failures are reported via log.
+    """
+    client = client or get_client()
+    repo = current_repo(cwd) if client else None
+    if client and repo:
+        issue_url = client.create_issue(repo, issue["title"], issue["body"], issue["labels"], log=log)
+        if not issue_url:
+            log(f"⚠️  Failed to create issue: {issue['title']}")
+        return issue_url
+
+    cmd = [
+        GH, 'issue', 'create',
+        '--title', issue["title"],
+        '--body-file', '-'
+    ]
+    for label in issue["labels"]:
+        cmd.extend(['--label', label])
+    try:
+        # Body goes over stdin: no argv size limit for long descriptions
+        ISSUE_CREATION_LIMIT.acquire()
+        result = subprocess.run(cmd, input=issue["body"], capture_output=True, text=True, cwd=cwd)
+        if result.returncode == 0:
+            return result.stdout.strip()
+        log(f"⚠️  Failed to create issue: {issue['title']}: {result.stderr.strip()}")
+    except Exception as e:
+        log(f"⚠️  Error creating issue: {e}")
+    return None
+
+
+def create_issues(issues: List[Dict], cwd: str, *, announce: bool = True) -> List[Optional[str]]:
+    """
+    Create issues in one batched GraphQL request, retrying failures one by one
+
+    Fewer than BULK_THRESHOLD issues skip the batch and go straight to the
+    per-issue path. Returns URLs in input order (None where creation
+    failed). Per-issue progress is buffered and printed once at the end;
+    announce=False leaves the "Created" lines to the caller.
+    """
+    if len(issues) >= BULK_THRESHOLD:
+        issue_urls = bulk_create_issues(issues, cwd=cwd)
+    else:
+        issue_urls = [None] * len(issues)
+    log = BufferedLog()
+
+    # Create anything the batch didn't (or all of a small set) one at a time, side by side
+    failed = [i for i, issue_url in enumerate(issue_urls) if not issue_url]
+    if failed:
+        create = functools.partial(create_issue, cwd=cwd, log=log)
+        with ThreadPoolExecutor(max_workers=min(RETRY_WORKERS, len(failed))) as executor:
+            for i, issue_url in zip(failed, executor.map(create, [issues[i] for i in failed])):
+                issue_urls[i] = issue_url
+
+    if announce:
+        for issue_url in filter(None, issue_urls):
+            log(f"✅ Created: {issue_url}")
+    log.flush()
+    return issue_urls
+
+
+def create_migration_issues_bulk(projects: List[Dict]) -> List[Optional[str]]:
+    """Create migration issues for projects, returning URLs in input order (None on failure)"""
+    # Callers report each project's URL themselves
+    return create_issues([migration_issue(project) for project in projects],
+                         cwd=AUTOFLOW_DIR, announce=False)
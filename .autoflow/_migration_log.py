@@ -0,0 +1,80 @@
+"""
+Append-only migration log for the Archon migration scripts
+
+Every state change is one NDJSON line in migrations.jsonl; the current
+record for each project is the merge of its events in log order. The
+per-project archon-<id>.json files are written once from that state
+instead of being re-read and rewritten after each step.
+"""
+
+import json
+from pathlib import Path
+from typing import Any, Dict
+
+try:
+    import orjson
+    ORJSON_AVAILABLE = True
+except ImportError:
+    ORJSON_AVAILABLE = False
+
+MIGRATIONS_DIR = Path("/Users/samiullah/AutoFlow/.autoflow/migrations")
+LOG_FILE = MIGRATIONS_DIR / "migrations.jsonl"
+
+
+def log_event(event: Dict) -> None:
+    """Append one event (must carry project_id) to the migration log"""
+    MIGRATIONS_DIR.mkdir(parents=True, exist_ok=True)
+    if ORJSON_AVAILABLE:
+        line = orjson.dumps(event) + b'\n'
+    else:
+        line = (json.dumps(event, ensure_ascii=False, separators=(',', ':')) + '\n').encode('utf-8')
+    with open(LOG_FILE, 'ab') as f:
+        f.write(line)
+
+
+def load_state() -> Dict[str, Dict]:
+    """Replay the log into project_id -> current record"""
+    state: Dict[str, Dict] = {}
+    if not LOG_FILE.exists():
+        return state
+
+    with open(LOG_FILE, encoding='utf-8') as f:
+        for line in f:
+            if not line.strip():
+                continue
+            event = json.loads(line)
+            state.setdefault(event["project_id"], {}).update(event)
+    return state
+
+
+def record_file(project_id: str) -> Path:
+    return MIGRATIONS_DIR / f"archon-{project_id}.json"
+
+
+def load_json(text) -> Any:
+    """Parse JSON text (orjson when available; raises json.JSONDecodeError)"""
+    return orjson.loads(text) if ORJSON_AVAILABLE else json.loads(text)
+
+
+def dump_json(data: Any, path: Path, indent: bool = True) -> None:
+    """
+    Write data as JSON with sorted keys (same bytes every run)
+
+    The document is serialized to one bytes blob and written with a single
+    write; indent=False gives compact output for machine-only files.
+    """
+    if ORJSON_AVAILABLE:
+        option = orjson.OPT_SORT_KEYS | (orjson.OPT_INDENT_2 if indent else 0)
+        path.write_bytes(orjson.dumps(data, option=option))
+    elif indent:
+        path.write_bytes(json.dumps(data, indent=2, sort_keys=True, ensure_ascii=False).encode('utf-8'))
+    else:
+        path.write_bytes(json.dumps(data, sort_keys=True, ensure_ascii=False,
+                                    separators=(',', ':')).encode('utf-8'))
+
+
+def write_record(record: Dict) -> Path:
+    """Write a project's final record to its archon-<id>.json file"""
+    path = record_file(record["archon_project_id"])
+    dump_json({key: value for key, value in record.items() if key != "project_id"}, path)
+    return path
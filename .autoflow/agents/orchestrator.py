@@ -19,79 +19,369 @@ Key Features:
 """
 
 import os
+import re
 import sys
 import json
+import time
+import shutil
+import hashlib
+import hmac
+import functools
+import importlib.util
+import threading
+import asyncio
+import sqlite3
 import subprocess
+import tempfile
+import http.client
+import http.server
 from pathlib import Path
-from typing import Dict, List, Optional, Any
+from typing import Callable, Dict, List, Optional, Any, ClassVar, Iterable, Iterator, Tuple, Union
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor, as_completed
 from dataclasses import dataclass, asdict
+from datetime import datetime
+from urllib.parse import urlencode
 
-# Claude SDK
-try:
-    import anthropic
-    CLAUDE_AVAILABLE = True
-except ImportError:
-    CLAUDE_AVAILABLE = False
+# Claude SDK (imported lazily in _get_claude: it is slow to import and unused in mock mode)
+CLAUDE_AVAILABLE = importlib.util.find_spec("anthropic") is not None
+if not CLAUDE_AVAILABLE:
     print("⚠️  Claude SDK not installed. Run: pip install anthropic")
     print("   Falling back to mock data...")
 
+# Tokenizer (optional): token-accurate summary truncation
+try:
+    import tiktoken
+    TIKTOKEN_AVAILABLE = True
+except ImportError:
+    TIKTOKEN_AVAILABLE = False
+
+# libgit2 bindings (optional): worktree/merge in-process instead of git subprocesses
+try:
+    import pygit2
+    PYGIT2_AVAILABLE = True
+except ImportError:
+    PYGIT2_AVAILABLE = False
+
 
 # ============================================================================
 # GitHub Issues Integration
 # ============================================================================
 
 class GitHubIssues:
-    """Git-native task management via GitHub Issues"""
+    """
+    Git-native task management via GitHub Issues
+
+    Talks to the GitHub REST API over one persistent HTTPS connection
+    instead of forking a `gh` process per call. Auth comes from
+    GITHUB_TOKEN / GH_TOKEN (or `gh auth token`, asked once), and the
+    owner/repo is read once from the `origin` remote. Calls are
+    serialized on an internal lock so phases can issue them from worker
+    threads while agents run.
+    """
+
+    API_HOST = "api.github.com"
+    MAX_RETRIES = 3
+    # POST/PATCH are not safe to replay once sent: they only retry failures
+    # before the request went out, and get a fresh connection when the
+    # pooled one sat idle long enough that the server may have dropped it
+    IDEMPOTENT_METHODS = frozenset({'GET', 'HEAD', 'PUT', 'DELETE'})
+    MAX_IDLE_REUSE = 5.0  # seconds
+    CACHE_TTL = 60.0  # seconds
+    CACHE_MAX_ENTRIES = 128
+    PAGE_SIZE = 100  # GitHub's maximum per_page
+
+    def __init__(self, base_dir: Optional[Path] = None):
+        self.base_dir = base_dir or Path.cwd()
+        self._token: Optional[str] = None
+        self._repo: Optional[str] = None
+        self._conn: Optional[http.client.HTTPSConnection] = None
+        self._conn_used_at = 0.0
+        self._repo_node = None
+        # Guards the shared connection and the cache across threads
+        self._lock = threading.RLock()
+        # path -> (etag, json, expires_at), least recently used first
+        self._cache: "OrderedDict[str, tuple]" = OrderedDict()
 
     def create_issue(self, title: str, body: str, labels: List[str]):
         """Create GitHub Issue for task tracking"""
-        cmd = [
-            'gh', 'issue', 'create',
-            '--title', title,
-            '--body', body,
-            '--label', ','.join(labels)
-        ]
-        result = subprocess.run(cmd, capture_output=True, text=True)
-        if result.returncode == 0:
-            # Extract issue number from URL
-            issue_url = result.stdout.strip()
-            issue_number = issue_url.split('/')[-1]
-            return issue_number
+        status, data = self._request('POST', self._repo_path('/issues'), {
+            "title": title,
+            "body": body,
+            "labels": labels
+        })
+        if status == 201:
+            return str(data["number"])
         return None
 
     def get_issue(self, issue_number: str) -> Dict[str, Any]:
         """Get issue details"""
-        cmd = ['gh', 'issue', 'view', issue_number, '--json', 'title,body,labels,state']
-        result = subprocess.run(cmd, capture_output=True, text=True)
-        if result.returncode == 0:
-            return json.loads(result.stdout)
+        status, data = self._cached_get(self._repo_path(f'/issues/{issue_number}'))
+        if status == 200:
+            return {key: data.get(key) for key in ('title', 'body', 'labels', 'state')}
         return {}
 
     def comment_issue(self, issue_number: str, comment: str):
         """Add comment to issue"""
-        cmd = ['gh', 'issue', 'comment', issue_number, '--body', comment]
-        subprocess.run(cmd)
+        self._request('POST', self._repo_path(f'/issues/{issue_number}/comments'), {"body": comment})
 
     def close_issue(self, issue_number: str):
         """Close issue"""
-        cmd = ['gh', 'issue', 'close', issue_number]
-        subprocess.run(cmd)
+        self._request('PATCH', self._repo_path(f'/issues/{issue_number}'), {"state": "closed"})
 
     def list_issues(self, labels: Optional[List[str]] = None) -> List[Dict]:
-        """List issues by label"""
-        cmd = ['gh', 'issue', 'list', '--json', 'number,title,labels,state']
+        """List issues by label (all pages, 100 per request)"""
+        params = {"state": "open", "per_page": self.PAGE_SIZE}
         if labels:
-            cmd.extend(['--label', ','.join(labels)])
-        result = subprocess.run(cmd, capture_output=True, text=True)
-        if result.returncode == 0:
-            return json.loads(result.stdout)
-        return []
+            params["labels"] = ','.join(labels)
+
+        issues = []
+        page = 1
+        while True:
+            params["page"] = page
+            status, data = self._cached_get(self._repo_path(f'/issues?{urlencode(params)}'))
+            if status != 200:
+                break
+            # The issues endpoint also returns pull requests
+            issues.extend(
+                {key: issue.get(key) for key in ('number', 'title', 'labels', 'state')}
+                for issue in data if 'pull_request' not in issue
+            )
+            if len(data) < self.PAGE_SIZE:
+                break
+            page += 1
+        return issues
+
+    def create_webhook(self, url: str, secret: str, events: Iterable[str] = ("issue_comment",)) -> bool:
+        """Register a repository webhook delivering events to url"""
+        status, _ = self._request('POST', self._repo_path('/hooks'), {
+            "name": "web",
+            "active": True,
+            "events": list(events),
+            "config": {"url": url, "content_type": "json", "secret": secret}
+        })
+        return status == 201
+
+    def create_issues_batch(self, specs: List[Dict[str, Any]]) -> List[Optional[str]]:
+        """
+        Create several issues in one GraphQL request
+
+        Each spec has title/body/labels like create_issue. Returns issue
+        numbers in spec order (None for any that failed).
+        """
+        if not specs:
+            return []
+
+        repo_id, label_ids = self._get_repo_node()
+        if not repo_id:
+            return [None] * len(specs)
+
+        params = ["$repo: ID!"]
+        fields = []
+        variables: Dict[str, Any] = {"repo": repo_id}
+        for i, spec in enumerate(specs):
+            params.append(f"$t{i}: String!, $b{i}: String, $l{i}: [ID!]")
+            fields.append(
+                f"m{i}: createIssue(input: {{repositoryId: $repo, title: $t{i}, body: $b{i}, labelIds: $l{i}}}) "
+                f"{{ issue {{ number }} }}"
+            )
+            variables[f"t{i}"] = spec["title"]
+            variables[f"b{i}"] = spec.get("body", "")
+            variables[f"l{i}"] = [label_ids[name] for name in spec.get("labels", []) if name in label_ids]
+
+        query = f"mutation({', '.join(params)}) {{ {' '.join(fields)} }}"
+        status, data = self._request('POST', '/graphql', {"query": query, "variables": variables})
+
+        results = ((data or {}).get("data") or {}) if status == 200 else {}
+        numbers = []
+        for i in range(len(specs)):
+            created = results.get(f"m{i}") or {}
+            issue = created.get("issue") or {}
+            numbers.append(str(issue["number"]) if "number" in issue else None)
+        return numbers
+
+    def _get_repo_node(self):
+        """Fetch the repository node ID and label name → ID map (cached)"""
+        if self._repo_node is None:
+            owner, _, name = self._get_repo().partition('/')
+            query = """query($owner: String!, $name: String!) {
+  repository(owner: $owner, name: $name) {
+    id
+    labels(first: 100) { nodes { id name } }
+  }
+}"""
+            status, data = self._request('POST', '/graphql', {
+                "query": query,
+                "variables": {"owner": owner, "name": name}
+            })
+            repo = ((data or {}).get("data") or {}).get("repository") if status == 200 else None
+            if repo:
+                labels = {label["name"]: label["id"] for label in repo["labels"]["nodes"]}
+                self._repo_node = (repo["id"], labels)
+            else:
+                return None, {}
+        return self._repo_node
+
+    def _repo_path(self, suffix: str) -> str:
+        return f"/repos/{self._get_repo()}{suffix}"
+
+    def _get_token(self) -> Optional[str]:
+        """Resolve the API token once per process"""
+        if self._token is None:
+            token = os.environ.get("GITHUB_TOKEN") or os.environ.get("GH_TOKEN")
+            if not token:
+                try:
+                    result = subprocess.run(['gh', 'auth', 'token'], capture_output=True, text=True)
+                    if result.returncode == 0:
+                        token = result.stdout.strip()
+                except OSError:
+                    pass
+            self._token = token or ""
+            if not token:
+                # Resolved once, so this is reported once per process
+                print("⚠️  No GitHub token found (set GITHUB_TOKEN or run `gh auth login`); "
+                      "GitHub Issues will be skipped")
+        return self._token or None
+
+    def _get_repo(self) -> str:
+        """Resolve owner/repo from the origin remote once per process"""
+        if self._repo is None:
+            self._repo = ""
+            try:
+                result = subprocess.run(['git', 'config', '--get', 'remote.origin.url'],
+                                        capture_output=True, text=True, cwd=self.base_dir)
+                match = re.search(r'github\.com[:/]([^/]+/[^/]+?)(?:\.git)?/?$', result.stdout.strip())
+                if match:
+                    self._repo = match.group(1)
+            except OSError:
+                pass
+        return self._repo
+
+    def _cached_get(self, path: str):
+        """
+        GET with a short-lived cache plus ETag revalidation
+
+        Fresh entries are served without a request; stale ones send
+        If-None-Match, and a 304 reuses the cached body (304s do not
+        count against the rate limit).
+        """
+        with self._lock:
+            return self._cached_get_locked(path)
+
+    def _cached_get_locked(self, path: str):
+        now = time.monotonic()
+        cached = self._cache.get(path)
+        if cached:
+            self._cache.move_to_end(path)
+            etag, data, expires_at = cached
+            if now < expires_at:
+                return 200, data
+
+        extra_headers = {"If-None-Match": cached[0]} if cached and cached[0] else None
+        status, headers, data = self._send('GET', path, extra_headers=extra_headers)
+
+        if status == 304 and cached:
+            self._cache[path] = (cached[0], cached[1], now + self.CACHE_TTL)
+            return 200, cached[1]
+        if status == 200:
+            self._cache[path] = (headers.get("ETag"), data, now + self.CACHE_TTL)
+            self._cache.move_to_end(path)
+            while len(self._cache) > self.CACHE_MAX_ENTRIES:
+                self._cache.popitem(last=False)
+        return status, data
+
+    def _request(self, method: str, path: str, payload: Optional[Dict] = None):
+        """Send one API request over the shared connection, returning (status, json)"""
+        with self._lock:
+            status, _, data = self._send(method, path, payload)
+            if method != 'GET':
+                # Writes may change cached issues/lists: force ETag revalidation
+                for key, (etag, cached_data, _) in self._cache.items():
+                    self._cache[key] = (etag, cached_data, 0.0)
+        return status, data
+
+    def _send(self, method: str, path: str, payload: Optional[Dict] = None,
+              extra_headers: Optional[Dict[str, str]] = None):
+        """Perform the HTTP exchange, returning (status, headers, json)"""
+        token = self._get_token()
+        if not token or not self._get_repo():
+            return 0, {}, None
+
+        headers = {
+            "Authorization": f"Bearer {token}",
+            "Accept": "application/vnd.github+json",
+            "User-Agent": "autoflow",
+        }
+        if extra_headers:
+            headers.update(extra_headers)
+        body = None
+        if payload is not None:
+            body = json.dumps(payload).encode('utf-8')
+            headers["Content-Type"] = "application/json"
+
+        idempotent = method in self.IDEMPOTENT_METHODS
+        for attempt in range(self.MAX_RETRIES):
+            sent = False
+            try:
+                idle = time.monotonic() - self._conn_used_at
+                if self._conn is not None and not idempotent and idle > self.MAX_IDLE_REUSE:
+                    self._conn.close()
+                    self._conn = None
+                if self._conn is None:
+                    self._conn = http.client.HTTPSConnection(self.API_HOST, timeout=30)
+                self._conn.request(method, path, body=body, headers=headers)
+                sent = True
+                response = self._conn.getresponse()
+                raw = response.read()
+                self._conn_used_at = time.monotonic()
+            except (http.client.HTTPException, OSError) as e:
+                # Stale keep-alive connection or network hiccup: reconnect and retry
+                if self._conn is not None:
+                    self._conn.close()
+                    self._conn = None
+                # A sent POST/PATCH may have taken effect: retrying could duplicate it
+                if attempt == self.MAX_RETRIES - 1 or (sent and not idempotent):
+                    print(f"⚠️  GitHub API error: {e}")
+                    return 0, {}, None
+                time.sleep(0.3 * (2 ** attempt))
+                continue
+
+            try:
+                data = json.loads(raw) if raw else None
+            except ValueError:
+                # HTML error page from GitHub or a proxy: keep the status, drop the body
+                print(f"⚠️  GitHub API returned a non-JSON response (HTTP {response.status})")
+                data = None
+            return response.status, response.headers, data
 
 
 # ============================================================================
 # Context Firewall (90% Token Reduction)
 # ============================================================================
 
+@functools.lru_cache(maxsize=1)
+def _get_encoder():
+    """BPE tokenizer for summary budgets, or None to fall back to a char estimate"""
+    if not TIKTOKEN_AVAILABLE:
+        return None
+    try:
+        return tiktoken.get_encoding("cl100k_base")
+    except Exception:
+        # The encoding file is downloaded on first use; offline runs can't get it
+        return None
+
+
+# A line whose first non-blank character is -, *, 1, 2 or 3. Anchoring on a
+# literal newline (rather than MULTILINE ^) lets the regex engine jump from
+# line to line with its fast literal search instead of trying every offset.
+_KEY_POINT_RE = re.compile(r'\n([^\S\n]*[-*123][^\n]*)')
+
+
+def _find_key_points(text: str) -> List[str]:
+    """All key-point lines in `text` (which starts at a line boundary)"""
+    return _KEY_POINT_RE.findall('\n' + text)
+
+
 class ContextFirewall:
     """
     Agents return SUMMARIES, not full context
@@ -105,12 +395,30 @@ class ContextFirewall:
         self.firewall_dir = firewall_dir
         self.firewall_dir.mkdir(parents=True, exist_ok=True)
 
-    def save_full_output(self, agent_name: str, phase: str, content: str) -> str:
-        """Save full agent output to file"""
+    def save_full_output(self, agent_name: str, phase: str, content: Union[str, Iterable[str]]) -> str:
+        """
+        Save full agent output to file
+
+        `content` may be a string or an iterable of text chunks (e.g. a
+        Claude text stream); chunks are written as they arrive so the
+        whole document never has to be buffered here. The file is written
+        under a temporary name and renamed into place, so readers never
+        see a partial document.
+        """
         filename = f"{agent_name}-{phase}-{self._timestamp()}.md"
         filepath = self.firewall_dir / filename
-        with open(filepath, 'w') as f:
-            f.write(content)
+        tmp_path = filepath.with_name(filename + ".tmp")
+        chunks = (content,) if isinstance(content, str) else content
+        fd = os.open(tmp_path, os.O_WRONLY | os.O_CREAT | os.O_TRUNC | os.O_APPEND, 0o644)
+        try:
+            for chunk in chunks:
+                os.write(fd, chunk.encode('utf-8'))
+        except BaseException:
+            os.close(fd)
+            tmp_path.unlink(missing_ok=True)
+            raise
+        os.close(fd)
+        os.replace(tmp_path, filepath)
         return str(filepath)
 
     def create_summary(self, full_output: str, max_tokens: int = 2000) -> str:
@@ -120,21 +428,55 @@ class ContextFirewall:
         TODO: Use Claude to generate intelligent summary
         For now, use simple truncation + key points
         """
-        lines = full_output.split('\n')
+        # Extract key points (lines starting with -, *, numbers) in one regex pass
+        key_points = _find_key_points(full_output)
+        return self._format_summary(key_points[:20], len(key_points), max_tokens)
 
-        # Extract key points (lines starting with -, *, numbers)
-        key_points = [l for l in lines if l.strip().startswith(('-', '*', '1', '2', '3'))]
-
-        summary = f"SUMMARY ({len(key_points)} key points):\n\n"
-        summary += '\n'.join(key_points[:20])  # First 20 points
+    def save_and_summarize(self, agent_name: str, phase: str, chunks: Iterable[str],
+                           max_tokens: int = 2000) -> Tuple[str, str]:
+        """
+        Stream chunks to disk while extracting key points as lines complete
 
-        if len(summary) > max_tokens * 4:  # Rough char estimate
+        Only the current partial line and the first 20 key points are kept
+        in memory. Returns (filepath, summary).
+        """
+        key_points: List[str] = []
+        total = 0
+
+        def scan(chunks: Iterable[str]) -> Iterator[str]:
+            nonlocal total
+            pending = ''
+            for chunk in chunks:
+                yield chunk
+                pending += chunk
+                cut = pending.rfind('\n') + 1
+                if cut:
+                    found = _find_key_points(pending[:cut])
+                    total += len(found)
+                    key_points.extend(found[:20 - len(key_points)])
+                    pending = pending[cut:]
+            found = _find_key_points(pending)
+            total += len(found)
+            key_points.extend(found[:20 - len(key_points)])
+
+        filepath = self.save_full_output(agent_name, phase, scan(chunks))
+        return filepath, self._format_summary(key_points, total, max_tokens)
+
+    def _format_summary(self, key_points: List[str], total: int, max_tokens: int) -> str:
+        summary = f"SUMMARY ({total} key points):\n\n"
+        summary += '\n'.join(key_points)  # First 20 points
+
+        encoder = _get_encoder()
+        if encoder is not None:
+            tokens = encoder.encode(summary)
+            if len(tokens) > max_tokens:
+                summary = encoder.decode(tokens[:max_tokens]) + "\n\n[Truncated...]"
+        elif len(summary) > max_tokens * 4:  # Rough char estimate
             summary = summary[:max_tokens * 4] + "\n\n[Truncated...]"
 
         return summary
 
     def _timestamp(self) -> str:
-        from datetime import datetime
         return datetime.now().strftime("%Y%m%d-%H%M%S")
 
 
@@ -142,14 +484,39 @@ class ContextFirewall:
 # Git Worktree Manager (Parallel Execution)
 # ============================================================================
 
+_SLUG_RE = re.compile(r'[^a-z0-9]+')
+
+
+def _slugify(text: str, max_length: int = 60) -> str:
+    """Lowercase, dash-separated form of text that is safe in a refname and a path"""
+    return _SLUG_RE.sub('-', text.lower()).strip('-')[:max_length].rstrip('-') or "task"
+
+
 class WorktreeManager:
-    """Manage git worktrees for parallel agent execution"""
+    """
+    Manage git worktrees for parallel agent execution
+
+    Uses pygit2 (libgit2) when installed so each worktree operation runs
+    in-process; otherwise falls back to the git CLI.
+    """
+
+    # Upper bound on concurrent worktree operations (keeps FD/process use in check)
+    MAX_PARALLEL = 8
 
     def __init__(self, base_dir: Path):
         self.base_dir = base_dir
         self.worktrees_dir = base_dir / "worktrees"
         self.worktrees_dir.mkdir(parents=True, exist_ok=True)
 
+        # libgit2 repository handles are not safe for concurrent writes
+        self._repo_lock = threading.Lock()
+        self.repo = None
+        if PYGIT2_AVAILABLE:
+            try:
+                self.repo = pygit2.Repository(str(base_dir))
+            except pygit2.GitError:
+                self.repo = None
+
     def create_worktree(self, branch_name: str, issue_number: str) -> Optional[Path]:
         """Create worktree for agent"""
         worktree_path = self.worktrees_dir / branch_name
@@ -159,14 +526,88 @@ class WorktreeManager:
             return None
 
         # Create worktree
-        cmd = ['git', 'worktree', 'add', str(worktree_path), '-b', branch_name]
-        result = subprocess.run(cmd, cwd=self.base_dir)
-
-        if result.returncode == 0:
+        if self.repo is not None:
+            with self._repo_lock:
+                created = self._add_worktree_in_process(branch_name, worktree_path)
+        else:
+            cmd = ['git', 'worktree', 'add', str(worktree_path), '-b', branch_name]
+            created = self._run_quiet(cmd)
+
+        if created:
             print(f"✅ Created worktree: {worktree_path}")
             return worktree_path
         return None
 
+    def create_worktrees_batch(self, specs: List[Tuple[str, str]]) -> Dict[str, Optional[Path]]:
+        """
+        Create worktrees for several (branch_name, issue_number) pairs concurrently
+
+        Git locks the refs/worktree metadata it touches, so the adds can
+        overlap; results are keyed by branch name.
+        """
+        results: Dict[str, Optional[Path]] = {}
+        if not specs:
+            return results
+
+        with ThreadPoolExecutor(max_workers=min(self.MAX_PARALLEL, len(specs))) as executor:
+            futures = {executor.submit(self.create_worktree, *spec): spec[0] for spec in specs}
+            for future in as_completed(futures):
+                branch_name = futures[future]
+                try:
+                    results[branch_name] = future.result()
+                except Exception as e:
+                    print(f"❌ Failed to create worktree {branch_name}: {e}")
+                    results[branch_name] = None
+        return results
+
+    def check_mergeable_batch(self, branches: List[str]) -> Dict[str, bool]:
+        """
+        Check which branches merge cleanly into main, in one git process
+
+        Feeds every `main <branch>` pair to `git merge-tree --stdin` and
+        reads one NUL-delimited result per pair. Nothing is written to
+        the index or working tree.
+        """
+        if not branches:
+            return {}
+
+        # merge-tree aborts the whole batch on an unknown ref, so filter first
+        refs = subprocess.run(['git', 'for-each-ref', '--format=%(refname:short)', 'refs/heads'],
+                              capture_output=True, text=True, cwd=self.base_dir)
+        known = set(refs.stdout.split())
+        candidates = [branch for branch in branches if branch in known]
+        results = {branch: False for branch in branches}
+        if not candidates:
+            return results
+
+        proc = subprocess.Popen(['git', 'merge-tree', '--write-tree', '--stdin'],
+                                stdin=subprocess.PIPE, stdout=subprocess.PIPE, stderr=subprocess.PIPE,
+                                text=True, cwd=self.base_dir)
+        stdout, stderr = proc.communicate(''.join(f"main {branch}\n" for branch in candidates))
+        if not stdout:
+            # Older git without merge-tree --stdin: let the real merge decide
+            print(f"⚠️  Mergeability check unavailable: {stderr.strip()}")
+            return {branch: branch in known for branch in branches}
+
+        fields = stdout.split('\0')
+        i = 0
+        for branch in candidates:
+            if i + 1 >= len(fields):
+                break
+            status = fields[i]
+            i += 2  # status, toplevel tree OID
+            if status != '1':
+                # Conflicted file entries, then informational messages
+                while fields[i] != '':
+                    i += 1
+                i += 1
+                while fields[i] != '':
+                    path_count = int(fields[i])
+                    i += 1 + path_count + 2  # count, paths, type, message
+            i += 1  # record terminator
+            results[branch] = status == '1'
+        return results
+
     def merge_worktree(self, branch_name: str):
         """Merge worktree back to main"""
         worktree_path = self.worktrees_dir / branch_name
@@ -175,15 +616,102 @@ class WorktreeManager:
             print(f"❌ Worktree not found: {worktree_path}")
             return False
 
+        if self.repo is not None:
+            with self._repo_lock:
+                merged = self._merge_in_process(branch_name, worktree_path)
+            if not merged:
+                return False
+        else:
+            # Merge to main, then clean up, as one shell chain (one fork instead of four)
+            script = ('git checkout -q main && git merge -q --no-ff --no-edit "$1" && '
+                      'git worktree remove "$2" && git branch -q -d "$1"')
+            if not self._run_quiet(['sh', '-c', script, 'sh', branch_name, str(worktree_path)]):
+                return False
+
+        print(f"✅ Merged and cleaned up: {branch_name}")
+        return True
+
+    def _run_quiet(self, cmd: List[str]) -> bool:
+        """Run a command whose stdout is not needed; report stderr only on failure"""
+        result = subprocess.run(cmd, cwd=self.base_dir, stdin=subprocess.DEVNULL,
+                                stdout=subprocess.DEVNULL, stderr=subprocess.PIPE, text=True)
+        if result.returncode != 0:
+            print(f"❌ {' '.join(cmd[:3])} failed: {result.stderr.strip()}")
+            return False
+        return True
+
+    def _add_worktree_in_process(self, branch_name: str, worktree_path: Path) -> bool:
+        """`git worktree add <path> -b <branch>` via libgit2"""
+        try:
+            branch = self.repo.branches.local.create(branch_name, self.repo.head.peel(pygit2.Commit))
+        except (pygit2.GitError, ValueError) as e:
+            print(f"❌ Could not create branch {branch_name}: {e}")
+            return False
+
+        try:
+            self.repo.add_worktree(branch_name, str(worktree_path), branch)
+        except (pygit2.GitError, ValueError) as e:
+            print(f"❌ Could not add worktree {worktree_path}: {e}")
+            branch.delete()
+            return False
+        return True
+
+    def _merge_in_process(self, branch_name: str, worktree_path: Path) -> bool:
+        """`git merge --no-ff` into main plus worktree/branch cleanup via libgit2"""
+        repo = self.repo
+        branch = repo.branches.local.get(branch_name)
+        if branch is None:
+            print(f"❌ Branch not found: {branch_name}")
+            return False
+
         # Merge to main
-        subprocess.run(['git', 'checkout', 'main'], cwd=self.base_dir)
-        subprocess.run(['git', 'merge', '--no-ff', branch_name], cwd=self.base_dir)
+        try:
+            repo.checkout('refs/heads/main')
+        except (pygit2.GitError, KeyError) as e:
+            # e.g. local changes on main that the checkout would overwrite
+            print(f"❌ Could not check out main: {e}")
+            return False
 
-        # Cleanup
-        subprocess.run(['git', 'worktree', 'remove', str(worktree_path)], cwd=self.base_dir)
-        subprocess.run(['git', 'branch', '-d', branch_name], cwd=self.base_dir)
+        try:
+            analysis, _ = repo.merge_analysis(branch.target)
+        except pygit2.GitError as e:
+            print(f"❌ Could not analyze merge of {branch_name}: {e}")
+            return False
 
-        print(f"✅ Merged and cleaned up: {branch_name}")
+        if not analysis & pygit2.GIT_MERGE_ANALYSIS_UP_TO_DATE:
+            try:
+                repo.merge(branch.target)
+                if repo.index.conflicts is not None:
+                    print(f"❌ Merge conflicts in {branch_name}; worktree kept at {worktree_path}")
+                    repo.reset(repo.head.target, pygit2.GIT_RESET_HARD)
+                    return False
+
+                tree = repo.index.write_tree()
+                signature = repo.default_signature  # needs user.name/user.email
+                repo.create_commit(
+                    'HEAD', signature, signature,
+                    f"Merge branch '{branch_name}'\n",
+                    tree, [repo.head.target, branch.target]
+                )
+            except (pygit2.GitError, KeyError) as e:
+                # Same outcome as a failed `git merge`: main untouched, worktree kept
+                print(f"❌ Merge of {branch_name} failed: {e}; worktree kept at {worktree_path}")
+                repo.reset(repo.head.target, pygit2.GIT_RESET_HARD)
+                return False
+            finally:
+                repo.state_cleanup()
+
+        # Cleanup, refusing a dirty worktree the way `git worktree remove` does
+        try:
+            if pygit2.Repository(str(worktree_path)).status():
+                print(f"⚠️  {worktree_path} has uncommitted or untracked changes; worktree and branch kept")
+                return False
+            shutil.rmtree(worktree_path)
+            repo.lookup_worktree(branch_name).prune(True)
+            branch.delete()
+        except (pygit2.GitError, OSError) as e:
+            print(f"❌ Cleanup of {branch_name} failed: {e}")
+            return False
         return True
 
 
@@ -192,10 +720,21 @@ class WorktreeManager:
 # ============================================================================
 
 class HumanCheckpoint:
-    """Human approval for critical decisions"""
+    """
+    Human approval for critical decisions
 
-    def request_approval(self, checkpoint_type: str, data: Dict[str, Any]) -> bool:
-        """Request human approval"""
+    The answer is read without blocking the event loop, so other
+    coroutines (e.g. parallel worktree agents) keep running while a human
+    decides, and a prompt abandoned on timeout never holds up shutdown.
+    """
+
+    def __init__(self, timeout: Optional[float] = None):
+        self.timeout = timeout
+        # A read left waiting by a timeout; the next prompt takes it over
+        self._pending: Optional[asyncio.Future] = None
+
+    async def request_approval(self, checkpoint_type: str, data: Dict[str, Any]) -> bool:
+        """Request human approval (raises asyncio.CancelledError on timeout)"""
         print("\n" + "="*60)
         print(f"🚦 HUMAN CHECKPOINT: {checkpoint_type}")
         print("="*60)
@@ -209,7 +748,15 @@ class HumanCheckpoint:
 
         # Request approval
         while True:
-            response = input("❓ Approve? [yes/no/modify]: ").lower()
+            try:
+                response = await asyncio.wait_for(
+                    asyncio.shield(self._read_line("❓ Approve? [yes/no/modify]: ")),
+                    self.timeout
+                )
+            except asyncio.TimeoutError:
+                print(f"\n⏱️  No answer for {checkpoint_type} within {self.timeout}s")
+                raise asyncio.CancelledError(checkpoint_type)
+            response = response.lower()
             if response in ['yes', 'y']:
                 return True
             elif response in ['no', 'n']:
@@ -217,6 +764,47 @@ class HumanCheckpoint:
             elif response in ['modify', 'm']:
                 return self._handle_modify(data)
 
+    def _read_line(self, prompt: str) -> asyncio.Future:
+        """input(prompt) without blocking the loop, reusing a read still in flight"""
+        print(prompt, end='', flush=True)
+        if self._pending is not None and not self._pending.done():
+            return self._pending
+
+        loop = asyncio.get_running_loop()
+        future = loop.create_future()
+
+        def settle(line: str):
+            if future.done():
+                return
+            if line:
+                future.set_result(line.rstrip('\n'))
+            else:
+                future.set_exception(EOFError())
+
+        try:
+            # Wait for stdin on the loop itself: no thread is left blocked
+            # in a read that a timeout abandoned
+            fd = sys.stdin.fileno()
+
+            def on_readable():
+                loop.remove_reader(fd)
+                settle(sys.stdin.readline())
+
+            loop.add_reader(fd, on_readable)
+        except (NotImplementedError, ValueError, OSError):
+            # No selector for stdin (e.g. Windows): read on a daemon thread
+            def read():
+                line = sys.stdin.readline()
+                try:
+                    loop.call_soon_threadsafe(settle, line)
+                except RuntimeError:
+                    pass  # the event loop is gone; nobody is waiting
+
+            threading.Thread(target=read, name="checkpoint-input", daemon=True).start()
+
+        self._pending = future
+        return future
+
     def _handle_modify(self, data: Dict[str, Any]) -> bool:
         """Handle modification request"""
         print("\n📝 Modification not implemented yet.")
@@ -224,6 +812,281 @@ class HumanCheckpoint:
         return False
 
 
+# ============================================================================
+# GitHub Webhook Receiver (checkpoint decisions as issue comments)
+# ============================================================================
+
+class WebhookReceiver:
+    """
+    Minimal GitHub webhook endpoint for checkpoint decisions
+
+    Listens on /webhook/github, verifies X-Hub-Signature-256 against the
+    shared secret, and turns `issue_comment` events whose comment starts
+    with /approve or /reject into on_decision(issue_number, approved)
+    calls. Only repository owners, members and collaborators can decide:
+    on a public repo anyone can comment. Each delivery is acknowledged
+    immediately; decisions are handled one at a time on a worker thread.
+    """
+
+    PATH = "/webhook/github"
+    TRUSTED_ASSOCIATIONS = frozenset({"OWNER", "MEMBER", "COLLABORATOR"})
+
+    def __init__(self, secret: str, on_decision, port: int = 8787):
+        self.secret = secret.encode('utf-8')
+        self.on_decision = on_decision
+        self.port = port
+        self._decision_lock = threading.Lock()
+
+    def serve_forever(self):
+        receiver = self
+
+        class Handler(http.server.BaseHTTPRequestHandler):
+            def do_POST(self):
+                body = self.rfile.read(int(self.headers.get("Content-Length") or 0))
+                status, decision = receiver._parse(self.path, self.headers, body)
+                self.send_response(status)
+                self.end_headers()
+                if decision:
+                    threading.Thread(target=receiver._decide, args=decision, daemon=True).start()
+
+            def log_message(self, format, *args):
+                pass
+
+        server = http.server.ThreadingHTTPServer(("", self.port), Handler)
+        print(f"📡 Listening for GitHub webhooks on :{self.port}{self.PATH}")
+        try:
+            server.serve_forever()
+        except KeyboardInterrupt:
+            pass
+        finally:
+            server.server_close()
+
+    def _parse(self, path: str, headers, body: bytes) -> Tuple[int, Optional[Tuple[str, bool]]]:
+        """HTTP status for a delivery and the (issue, approved) decision it carries"""
+        if path != self.PATH:
+            return 404, None
+
+        expected = "sha256=" + hmac.new(self.secret, body, hashlib.sha256).hexdigest()
+        # Compare bytes: compare_digest rejects str with non-ASCII characters
+        signature = headers.get("X-Hub-Signature-256", "").encode('utf-8')
+        if not hmac.compare_digest(expected.encode('ascii'), signature):
+            return 401, None
+
+        if headers.get("X-GitHub-Event") != "issue_comment":
+            return 204, None  # ping and anything else we didn't ask for
+        try:
+            event = json.loads(body)
+        except ValueError:
+            return 400, None
+        if event.get("action") != "created":
+            return 204, None
+
+        comment = event.get("comment") or {}
+        command = comment.get("body", "").strip().split(maxsplit=1)
+        if not command or command[0].lower() not in ("/approve", "/reject"):
+            return 204, None
+        if comment.get("author_association") not in self.TRUSTED_ASSOCIATIONS:
+            login = (comment.get("user") or {}).get("login", "unknown")
+            print(f"⚠️  Ignoring {command[0]} from @{login}: not a repository collaborator")
+            return 403, None
+        issue_number = str((event.get("issue") or {}).get("number"))
+        return 202, (issue_number, command[0].lower() == "/approve")
+
+    def _decide(self, issue_number: str, approved: bool):
+        with self._decision_lock:
+            try:
+                if not self.on_decision(issue_number, approved):
+                    print(f"⚠️  No workflow is waiting on issue #{issue_number}")
+            except SystemExit:
+                pass  # a phase stopped its workflow; keep serving
+            except Exception as e:
+                print(f"⚠️  Failed to resume workflow for issue #{issue_number}: {e}")
+
+
+# ============================================================================
+# Response Cache (skip repeat agent runs)
+# ============================================================================
+
+class ResponseCache:
+    """
+    Persistent cache of agent results, shared across workflow runs
+
+    Keyed by agent name, the normalized task description (case and
+    whitespace folded) and any extra inputs. Entries live in a SQLite
+    file and expire after ttl seconds. The orchestrator only stores
+    results a checkpoint approved, and drops them when a later run's
+    checkpoint rejects them.
+    """
+
+    DEFAULT_TTL = 24 * 60 * 60  # seconds
+
+    def __init__(self, db_path: Path, ttl: float = DEFAULT_TTL):
+        self.ttl = ttl
+        db_path.parent.mkdir(parents=True, exist_ok=True)
+        # Phases call in from worker threads; the lock serializes access
+        self._db = sqlite3.connect(str(db_path), check_same_thread=False)
+        self._lock = threading.Lock()
+        with self._lock, self._db:
+            self._db.execute(
+                "CREATE TABLE IF NOT EXISTS responses ("
+                "key TEXT PRIMARY KEY, agent TEXT, task TEXT, result TEXT, created_at REAL)"
+            )
+
+    def get(self, agent: str, task: str, *extra: Any) -> Optional[Dict[str, Any]]:
+        """Cached result, or None if missing or expired"""
+        key = self._key(agent, task, extra)
+        with self._lock:
+            row = self._db.execute(
+                "SELECT result, created_at FROM responses WHERE key = ?", (key,)
+            ).fetchone()
+            if row and time.time() - row[1] > self.ttl:
+                with self._db:
+                    self._db.execute("DELETE FROM responses WHERE key = ?", (key,))
+                return None
+        return json.loads(row[0]) if row else None
+
+    def put(self, agent: str, task: str, result: Dict[str, Any], *extra: Any):
+        """Store an agent result (and drop every expired one)"""
+        now = time.time()
+        with self._lock, self._db:
+            self._db.execute("DELETE FROM responses WHERE created_at < ?", (now - self.ttl,))
+            self._db.execute(
+                "INSERT OR REPLACE INTO responses VALUES (?, ?, ?, ?, ?)",
+                (self._key(agent, task, extra), agent, task, json.dumps(result), now)
+            )
+
+    def delete(self, agent: str, task: str, *extra: Any):
+        """Forget a result (e.g. one a checkpoint rejected)"""
+        with self._lock, self._db:
+            self._db.execute("DELETE FROM responses WHERE key = ?", (self._key(agent, task, extra),))
+
+    @staticmethod
+    def _key(agent: str, task: str, extra: Tuple) -> str:
+        normalized = " ".join(task.lower().split())
+        return json.dumps([agent, normalized, list(extra)])
+
+
+# ============================================================================
+# Agent Helpers (prompt caching, streaming, memoization)
+# ============================================================================
+
+@functools.lru_cache(maxsize=1)
+def _get_claude():
+    """Shared Anthropic client (one connection pool for all agents), or None"""
+    if not CLAUDE_AVAILABLE:
+        return None
+    api_key = os.environ.get("ANTHROPIC_API_KEY")
+    if not api_key:
+        print("⚠️  ANTHROPIC_API_KEY not set. Using mock data.")
+        return None
+    import anthropic
+    return anthropic.Anthropic(api_key=api_key)
+
+
+def _cached_system(text: str) -> List[Dict[str, Any]]:
+    """Wrap a static system prompt so Anthropic caches it across calls"""
+    return [{"type": "text", "text": text, "cache_control": {"type": "ephemeral"}}]
+
+
+def _compact_json(data: Any) -> str:
+    """Serialize prompt data without whitespace (indentation costs tokens, not meaning)"""
+    def trim(value):
+        if isinstance(value, float):
+            return round(value, 2)
+        if isinstance(value, dict):
+            return {key: trim(item) for key, item in value.items()}
+        if isinstance(value, list):
+            return [trim(item) for item in value]
+        return value
+
+    return json.dumps(trim(data), separators=(',', ':'), ensure_ascii=False)
+
+
+def _tee_to_file(chunks: Iterable[str], path: Path, keep: Callable[[], bool]) -> Iterator[str]:
+    """
+    Yield chunks while copying them to `path`
+
+    The copy only appears once the chunks are exhausted and keep() agrees;
+    an error or an unwanted copy leaves nothing behind.
+    """
+    tmp_path = path.with_suffix('.tmp')
+    try:
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            for chunk in chunks:
+                f.write(chunk)
+                yield chunk
+        if keep():
+            os.replace(tmp_path, path)
+    finally:
+        tmp_path.unlink(missing_ok=True)
+
+
+def _memoize_by_topic(method):
+    """Cache an async per-topic lookup on the instance (topics repeat across phases)"""
+    @functools.wraps(method)
+    async def wrapper(self, topic: str):
+        cache = self.__dict__.setdefault('_topic_cache', {})
+        key = (method.__name__, topic)
+        if key not in cache:
+            cache[key] = await method(self, topic)
+        return cache[key]
+    return wrapper
+
+
+def _log_cache_usage(agent_name: str, message) -> None:
+    """Report prompt cache hits/writes for a response"""
+    usage = getattr(message, "usage", None)
+    read = getattr(usage, "cache_read_input_tokens", None) or 0
+    written = getattr(usage, "cache_creation_input_tokens", None) or 0
+    if read or written:
+        print(f"   💾 {agent_name} prompt cache: {read} tokens read, {written} written")
+
+
+def _iter_json_array(chunks: Iterable[str]) -> Iterator[Any]:
+    """
+    Yield the items of the first JSON array in a text stream as each completes
+
+    Anything before the opening '[' (prose, a ```json fence) is skipped.
+    Stops quietly at the closing ']' or on text that is not valid JSON.
+    """
+    decoder = json.JSONDecoder()
+    buffer = ''
+    pos = -1  # index just past '[' once the array has started
+    chunks = iter(chunks)
+    done = False
+
+    while True:
+        if pos < 0:
+            start = buffer.find('[')
+            if start >= 0:
+                pos = start + 1
+        while pos >= 0:
+            # Skip separators between items
+            while pos < len(buffer) and buffer[pos] in ' \t\r\n,':
+                pos += 1
+            if pos >= len(buffer):
+                break
+            if buffer[pos] == ']':
+                return
+            try:
+                item, end = decoder.raw_decode(buffer, pos)
+            except json.JSONDecodeError:
+                if done:
+                    return
+                break  # item still incomplete: wait for more text
+            if end == len(buffer) and not done:
+                break  # a bare number/literal might continue in the next chunk
+            yield item
+            pos = end
+        if done:
+            return
+        chunk = next(chunks, None)
+        if chunk is None:
+            done = True
+        else:
+            buffer += chunk
+
+
 # ============================================================================
 # Real Agent Implementation (Phase 1: Research)
 # ============================================================================
@@ -231,50 +1094,80 @@ class HumanCheckpoint:
 class ResearchAgent:
     """Phase 1: Research patterns, examples, best practices"""
 
-    def __init__(self, context_firewall: ContextFirewall):
+    # Identical for every topic, so it is sent as a cached system block
+    _STATIC_SYSTEM: ClassVar[str] = """You are the AutoFlow research agent.
+
+You will be given a research task along with knowledge base results,
+code examples and documentation as JSON.
+
+Create a comprehensive research document that:
+1. Analyzes all patterns found
+2. Compares pros/cons of each approach
+3. Provides security considerations
+4. Estimates implementation complexity
+5. Recommends the best approach with reasoning
+6. Includes implementation considerations
+
+Format as detailed markdown."""
+
+    def __init__(self, context_firewall: ContextFirewall, cache_dir: Optional[Path] = None):
         self.firewall = context_firewall
-        self.claude = None
-        if CLAUDE_AVAILABLE:
-            api_key = os.environ.get("ANTHROPIC_API_KEY")
-            if api_key:
-                self.claude = anthropic.Anthropic(api_key=api_key)
-            else:
-                print("⚠️  ANTHROPIC_API_KEY not set. Using mock data.")
+        # Claude-written documents keyed by a hash of their inputs
+        self.cache_dir = cache_dir
+        if self.cache_dir:
+            self.cache_dir.mkdir(parents=True, exist_ok=True)
+        self.claude = _get_claude()
 
-    def execute(self, topic: str, sources: List[str]) -> Dict[str, Any]:
+    async def execute(self, topic: str, sources: List[str]) -> Dict[str, Any]:
         """Execute research phase"""
         print(f"\n🔍 Research Agent: {topic}")
         print("="*60)
 
-        # Step 1: Search knowledge base (Archon MCP)
+        # Steps 1-3 are independent lookups: run them concurrently
         print("\n📚 Searching knowledge base...")
-        kb_results = self._search_knowledge_base(topic)
-
-        # Step 2: Search code examples (Archon MCP)
-        print("\n💻 Searching code examples...")
-        code_examples = self._search_code_examples(topic)
-
-        # Step 3: Review documentation
-        print("\n📖 Reviewing documentation...")
-        docs = self._review_docs(topic)
-
-        # Step 4: Create full research document
-        full_output = self._create_research_document(topic, kb_results, code_examples, docs)
-
-        # Step 5: Save full output (context firewall)
-        filepath = self.firewall.save_full_output("research", topic, full_output)
+        print("💻 Searching code examples...")
+        print("📖 Reviewing documentation...")
+        kb_results, code_examples, docs = await asyncio.gather(
+            self._search_knowledge_base(topic),
+            self._search_code_examples(topic),
+            self._review_docs(topic)
+        )
 
-        # Step 6: Create summary (90% token reduction)
-        summary = self.firewall.create_summary(full_output)
+        # Step 4-6: Stream the research document into the context firewall,
+        # summarizing (90% token reduction) as the text arrives. The Claude
+        # stream blocks, so it is consumed on a worker thread
+        filepath = None
+        cache_file = self._document_cache_file(topic, kb_results, code_examples, docs)
+        if self.claude:
+            try:
+                document = self._create_research_document(topic, kb_results, code_examples, docs, cache_file)
+                filepath, summary = await asyncio.to_thread(
+                    self.firewall.save_and_summarize, "research", topic, document
+                )
+            except Exception as e:
+                # The firewall discards the partial file, so the fallback starts clean
+                print(f"⚠️  Claude API error: {e}")
+                print("   Falling back to basic document...")
+        if filepath is None:
+            document = self._basic_research_document(topic, kb_results, code_examples, docs)
+            filepath, summary = self.firewall.save_and_summarize("research", topic, document)
 
         return {
             "summary": summary,
             "full_document": filepath,
             "findings_count": len(kb_results) + len(code_examples),
-            "recommendation": self._generate_recommendation(kb_results, code_examples)
+            "recommendation": self._generate_recommendation(kb_results, code_examples),
+            # Lets a rejected document be dropped from the cache later
+            "document_key": cache_file.stem if cache_file else None
         }
 
-    def _search_knowledge_base(self, topic: str) -> List[Dict]:
+    def discard_cached_document(self, document_key: Optional[str]):
+        """Forget a cached Claude document (e.g. one a checkpoint rejected)"""
+        if self.cache_dir and document_key:
+            (self.cache_dir / f"{document_key}.md").unlink(missing_ok=True)
+
+    @_memoize_by_topic
+    async def _search_knowledge_base(self, topic: str) -> List[Dict]:
         """Search Archon knowledge base"""
         # TODO: Use Archon MCP archon:perform_rag_query
         # For now, return mock data
@@ -284,7 +1177,8 @@ class ResearchAgent:
             {"title": f"Pattern 3 for {topic}", "relevance": 0.82}
         ]
 
-    def _search_code_examples(self, topic: str) -> List[Dict]:
+    @_memoize_by_topic
+    async def _search_code_examples(self, topic: str) -> List[Dict]:
         """Search code examples"""
         # TODO: Use Archon MCP archon:search_code_examples
         return [
@@ -292,50 +1186,46 @@ class ResearchAgent:
             {"title": f"Example 2 for {topic}", "language": "typescript"}
         ]
 
-    def _review_docs(self, topic: str) -> List[str]:
+    @_memoize_by_topic
+    async def _review_docs(self, topic: str) -> List[str]:
         """Review documentation"""
         return [f"Documentation for {topic}"]
 
-    def _create_research_document(self, topic, kb_results, code_examples, docs) -> str:
-        """Create comprehensive research document"""
+    def _create_research_document(self, topic, kb_results, code_examples, docs,
+                                  cache_file: Optional[Path] = None) -> Iterator[str]:
+        """Have Claude write the research document, yielded as text chunks (API errors propagate)"""
+        if cache_file and cache_file.exists():
+            print("   ♻️  Reusing cached research document")
+            yield cache_file.read_text(encoding='utf-8')
+            return
 
-        # If Claude is available, use it to analyze and synthesize
-        if self.claude:
-            try:
-                prompt = f"""Research Task: {topic}
+        prompt = f"""Research Task: {topic}
 
 Knowledge Base Results:
-{json.dumps(kb_results, indent=2)}
+{_compact_json(kb_results)}
 
 Code Examples:
-{json.dumps(code_examples, indent=2)}
+{_compact_json(code_examples)}
 
 Documentation:
-{json.dumps(docs, indent=2)}
-
-Create a comprehensive research document that:
-1. Analyzes all patterns found
-2. Compares pros/cons of each approach
-3. Provides security considerations
-4. Estimates implementation complexity
-5. Recommends the best approach with reasoning
-6. Includes implementation considerations
-
-Format as detailed markdown."""
-
-                message = self.claude.messages.create(
-                    model="claude-sonnet-4-20250514",
-                    max_tokens=4000,
-                    messages=[{"role": "user", "content": prompt}]
-                )
-
-                return message.content[0].text
-
-            except Exception as e:
-                print(f"⚠️  Claude API error: {e}")
-                print("   Falling back to basic document...")
-
-        # Fallback to basic document
+{_compact_json(docs)}"""
+
+        with self.claude.messages.stream(
+            model="claude-sonnet-4-20250514",
+            max_tokens=4000,
+            system=_cached_system(self._STATIC_SYSTEM),
+            messages=[{"role": "user", "content": prompt}]
+        ) as stream:
+            text = stream.text_stream
+            if cache_file:
+                # Only a document Claude finished is worth reusing
+                text = _tee_to_file(text, cache_file,
+                                    keep=lambda: stream.get_final_message().stop_reason == "end_turn")
+            yield from text
+            _log_cache_usage("research", stream.get_final_message())
+
+    def _basic_research_document(self, topic, kb_results, code_examples, docs) -> str:
+        """Research document built from the lookups alone (no Claude)"""
         doc = f"# Research: {topic}\n\n"
         doc += f"## Knowledge Base Results ({len(kb_results)} found)\n\n"
         for result in kb_results:
@@ -351,6 +1241,14 @@ Format as detailed markdown."""
 
         return doc
 
+    def _document_cache_file(self, topic, kb_results, code_examples, docs) -> Optional[Path]:
+        """Cache path for a document generated from exactly these inputs"""
+        if not self.cache_dir:
+            return None
+        content = json.dumps([topic, kb_results, code_examples, docs], sort_keys=True)
+        key = hashlib.blake2b(content.encode('utf-8'), digest_size=16).hexdigest()
+        return self.cache_dir / f"{key}.md"
+
     def _generate_recommendation(self, kb_results, code_examples) -> str:
         """Generate recommendation based on research"""
         return f"Based on {len(kb_results)} patterns and {len(code_examples)} examples, recommend proceeding with implementation."
@@ -363,22 +1261,47 @@ Format as detailed markdown."""
 class PlanAgent:
     """Phase 2: Create implementation plan based on research"""
 
-    def __init__(self, context_firewall: ContextFirewall):
+    # Identical for every task, so it is sent as a cached system block
+    _STATIC_SYSTEM: ClassVar[str] = """You are the AutoFlow planning agent.
+
+You will be given a task and a research summary.
+
+Break this down into specific, actionable implementation tasks.
+
+For each task provide:
+- name: Clear task name
+- type: setup/implementation/testing/documentation
+- hours: Estimated hours (realistic)
+
+Return as JSON array."""
+
+    def __init__(self, context_firewall: ContextFirewall, github: Optional[GitHubIssues] = None):
         self.firewall = context_firewall
-        self.claude = None
-        if CLAUDE_AVAILABLE:
-            api_key = os.environ.get("ANTHROPIC_API_KEY")
-            if api_key:
-                self.claude = anthropic.Anthropic(api_key=api_key)
-
-    def execute(self, task_description: str, research_summary: str) -> Dict[str, Any]:
-        """Execute planning phase"""
+        self.github = github
+        self.claude = _get_claude()
+
+    def execute(self, task_description: str, research_summary: str,
+                tasks: Optional[List[Dict]] = None) -> Dict[str, Any]:
+        """Execute planning phase (tasks: a breakdown already approved, reused as is)"""
         print(f"\n📋 Plan Agent: {task_description}")
         print("="*60)
 
         # Step 1: Break down into tasks
-        print("\n🔨 Breaking down into tasks...")
-        tasks = self._break_into_tasks(task_description, research_summary)
+        if tasks is None:
+            print("\n🔨 Breaking down into tasks...")
+            tasks = self._break_into_tasks(task_description, research_summary)
+
+        # Track every task as an issue, created in a single round-trip
+        task_issues = []
+        if self.github:
+            task_issues = self.github.create_issues_batch([
+                {
+                    "title": f"[TASK] {task['name']}",
+                    "body": f"Part of: {task_description}\n\nType: {task['type']}\nEstimate: {task['hours']}h",
+                    "labels": ["phase:implement", f"type:{task['type']}", "status:todo"]
+                }
+                for task in tasks
+            ])
 
         # Step 2: Identify dependencies
         print("\n🔗 Identifying dependencies...")
@@ -401,6 +1324,8 @@ class PlanAgent:
             "summary": summary,
             "full_document": filepath,
             "task_count": len(tasks),
+            "tasks": tasks,
+            "task_issues": task_issues,
             "estimated_hours": complexity["total_hours"],
             "plan_approved": False  # Requires human approval
         }
@@ -413,27 +1338,26 @@ class PlanAgent:
                 prompt = f"""Task: {task_description}
 
 Research Summary:
-{research_summary}
-
-Break this down into specific, actionable implementation tasks.
-
-For each task provide:
-- name: Clear task name
-- type: setup/implementation/testing/documentation
-- hours: Estimated hours (realistic)
-
-Return as JSON array."""
+{research_summary}"""
 
-                message = self.claude.messages.create(
+                tasks = []
+                with self.claude.messages.stream(
                     model="claude-sonnet-4-20250514",
                     max_tokens=2000,
+                    system=_cached_system(self._STATIC_SYSTEM),
                     messages=[{"role": "user", "content": prompt}]
-                )
+                ) as stream:
+                    # Pick tasks out of the JSON array as each one completes
+                    for task in _iter_json_array(stream.text_stream):
+                        print(f"   • {task.get('name', task) if isinstance(task, dict) else task}")
+                        tasks.append(task)
+                    content = stream.get_final_text()
+                    _log_cache_usage("plan", stream.get_final_message())
+
+                if tasks:
+                    return tasks
 
-                # Try to parse JSON from response
-                content = message.content[0].text
                 # Look for JSON array in the response
-                import re
                 json_match = re.search(r'\[.*\]', content, re.DOTALL)
                 if json_match:
                     return json.loads(json_match.group())
@@ -504,11 +1428,7 @@ class ImplementAgent:
 
     def __init__(self, context_firewall: ContextFirewall):
         self.firewall = context_firewall
-        self.claude = None
-        if CLAUDE_AVAILABLE:
-            api_key = os.environ.get("ANTHROPIC_API_KEY")
-            if api_key:
-                self.claude = anthropic.Anthropic(api_key=api_key)
+        self.claude = _get_claude()
 
     def execute(self, worktree_path: Path, plan_summary: str, task_description: str) -> Dict[str, Any]:
         """Execute implementation phase"""
@@ -598,27 +1518,24 @@ class ValidateAgent:
     def __init__(self, context_firewall: ContextFirewall):
         self.firewall = context_firewall
 
-    def execute(self, worktree_path: Path, task_description: str) -> Dict[str, Any]:
+    async def execute(self, worktree_path: Path, task_description: str) -> Dict[str, Any]:
         """Execute validation phase"""
         print(f"\n✅ Validate Agent: {task_description}")
         print("="*60)
         print(f"   Testing in: {worktree_path}")
 
-        # Step 1: Run unit tests
-        print("\n🧪 Running unit tests...")
-        unit_results = self._run_unit_tests(worktree_path)
+        # Steps 1-4: tests, lint and security scan in a single pytest session
+        print("\n🧪 Running unit + integration tests, 📊 ruff, 🔒 bandit (one pytest session)...")
+        report = await self._run_checks(worktree_path)
+        if report is None:
+            print("⚠️  No pytest JSON report (needs pytest-json-report, pytest-ruff, pytest-bandit)")
+            print("   Using placeholder results...")
+        groups = self._group_report(report)
 
-        # Step 2: Run integration tests
-        print("\n🔗 Running integration tests...")
-        integration_results = self._run_integration_tests(worktree_path)
-
-        # Step 3: Check code quality
-        print("\n📊 Checking code quality...")
-        quality_results = self._check_code_quality(worktree_path)
-
-        # Step 4: Security scan
-        print("\n🔒 Running security scan...")
-        security_results = self._security_scan(worktree_path)
+        unit_results = self._run_unit_tests(groups)
+        integration_results = self._run_integration_tests(groups)
+        quality_results = self._check_code_quality(groups, report)
+        security_results = self._security_scan(groups)
 
         # Step 5: Create validation report
         full_report = self._create_validation_report(
@@ -651,38 +1568,111 @@ class ValidateAgent:
             }
         }
 
-    def _run_unit_tests(self, worktree_path: Path) -> Dict[str, Any]:
-        """Run unit tests"""
-        # TODO: Run actual tests (pytest, jest, etc.)
+    async def _run_checks(self, worktree_path: Path) -> Optional[Dict[str, Any]]:
+        """
+        Run tests, ruff and bandit in one interpreter via pytest plugins
+
+        Returns the pytest-json-report document, or None if it could not
+        be produced (missing plugins, no pytest).
+
+        Nothing is written into the worktree (report, .pytest_cache,
+        bytecode, ruff cache): untracked files there would make
+        `git worktree remove` refuse to clean up after the merge.
+        """
+        env = dict(os.environ, PYTHONDONTWRITEBYTECODE="1", RUFF_NO_CACHE="true")
+        with tempfile.TemporaryDirectory(prefix="autoflow-validate-") as tmp:
+            report_file = Path(tmp) / "validate.json"
+            proc = await asyncio.create_subprocess_exec(
+                sys.executable, '-m', 'pytest', '--ruff', '--bandit', '-q',
+                '-p', 'no:cacheprovider',
+                '--json-report', f'--json-report-file={report_file}',
+                cwd=worktree_path, env=env, stdin=subprocess.DEVNULL,
+                stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL
+            )
+            await proc.wait()
+
+            if not report_file.exists():
+                return None
+            return json.loads(report_file.read_text(encoding='utf-8'))
+
+    def _group_report(self, report: Optional[Dict[str, Any]]) -> Optional[Dict[str, List[Dict]]]:
+        """Split report items into unit/integration/quality/security by plugin and marker"""
+        if report is None:
+            return None
+        groups: Dict[str, List[Dict]] = {"unit": [], "integration": [], "quality": [], "security": []}
+        for test in report.get("tests", []):
+            keywords = {keyword.lower() for keyword in test.get("keywords", [])}
+            if "ruff" in keywords:
+                groups["quality"].append(test)
+            elif "bandit" in keywords:
+                groups["security"].append(test)
+            elif "integration" in keywords:
+                groups["integration"].append(test)
+            else:
+                groups["unit"].append(test)
+        return groups
+
+    def _run_unit_tests(self, groups: Optional[Dict[str, List[Dict]]]) -> Dict[str, Any]:
+        """Unit test results"""
+        if groups is None:
+            return {
+                "passed": True,
+                "total": 15,
+                "failed": 0,
+                "coverage": "85%"
+            }
+        failed = _count_failed(groups["unit"])
         return {
-            "passed": True,
-            "total": 15,
-            "failed": 0,
-            "coverage": "85%"
+            "passed": failed == 0,
+            "total": len(groups["unit"]),
+            "failed": failed,
+            "coverage": "N/A"
         }
 
-    def _run_integration_tests(self, worktree_path: Path) -> Dict[str, Any]:
-        """Run integration tests"""
+    def _run_integration_tests(self, groups: Optional[Dict[str, List[Dict]]]) -> Dict[str, Any]:
+        """Integration test results (tests marked `integration`)"""
+        if groups is None:
+            return {
+                "passed": True,
+                "total": 8,
+                "failed": 0
+            }
+        failed = _count_failed(groups["integration"])
         return {
-            "passed": True,
-            "total": 8,
-            "failed": 0
+            "passed": failed == 0,
+            "total": len(groups["integration"]),
+            "failed": failed
         }
 
-    def _check_code_quality(self, worktree_path: Path) -> Dict[str, Any]:
-        """Check code quality (linting, formatting)"""
+    def _check_code_quality(self, groups: Optional[Dict[str, List[Dict]]],
+                            report: Optional[Dict[str, Any]]) -> Dict[str, Any]:
+        """Code quality results (ruff lint/format items)"""
+        if groups is None:
+            return {
+                "passed": True,
+                "issues": 0,
+                "warnings": 2
+            }
+        issues = _count_failed(groups["quality"])
         return {
-            "passed": True,
-            "issues": 0,
-            "warnings": 2
+            "passed": issues == 0,
+            "issues": issues,
+            "warnings": len(report.get("warnings", []))
         }
 
-    def _security_scan(self, worktree_path: Path) -> Dict[str, Any]:
-        """Run security scan"""
+    def _security_scan(self, groups: Optional[Dict[str, List[Dict]]]) -> Dict[str, Any]:
+        """Security scan results (bandit items)"""
+        if groups is None:
+            return {
+                "passed": True,
+                "vulnerabilities": 0,
+                "severity": "none"
+            }
+        vulnerabilities = _count_failed(groups["security"])
         return {
-            "passed": True,
-            "vulnerabilities": 0,
-            "severity": "none"
+            "passed": vulnerabilities == 0,
+            "vulnerabilities": vulnerabilities,
+            "severity": "none" if vulnerabilities == 0 else "see bandit output"
         }
 
     def _create_validation_report(self, task_description, unit, integration, quality, security) -> str:
@@ -717,10 +1707,23 @@ class ValidateAgent:
         return doc
 
 
+def _count_failed(tests: List[Dict]) -> int:
+    """Failed (or errored) items in a pytest-json-report test list"""
+    return sum(1 for test in tests if test.get("outcome") in ("failed", "error"))
+
+
 # ============================================================================
 # Main Orchestrator (CCPM 5-Phase Workflow)
 # ============================================================================
 
+@dataclass
+class CliCommand:
+    """What main() was asked to do"""
+    action: str  # "run", "serve" or "register-webhook"
+    argument: str  # task description, port, or public URL
+    use_cache: bool = True  # False with --no-cache
+
+
 class AutoFlowOrchestrator:
     """
     Complete git-native workflow orchestrator
@@ -731,136 +1734,317 @@ class AutoFlowOrchestrator:
     3. Implement (Git worktree) → Commits
     4. Validate (Git worktree) → Results
     5. Integrate (Main branch) → Deploy
+
+    With AUTOFLOW_WEBHOOK_SECRET set, checkpoints are posted as issue
+    comments instead of prompting on stdin: the workflow state is saved
+    to .autoflow/state/<workflow_id>.json, the process exits, and an
+    `/approve` or `/reject` comment (delivered by WebhookReceiver)
+    resumes it. Without a secret, or without an issue to comment on,
+    checkpoints stay interactive.
     """
 
-    def __init__(self):
+    # Checkpoint after each of phases 1-4, and the stage a rejection stops
+    CHECKPOINTS = (
+        ("Research Complete", "Research"),
+        ("Plan Review", "Plan"),
+        ("Code Review", "Implementation"),
+        ("Validation Review", "Validation"),
+    )
+
+    RESEARCH_SOURCES = ["kb", "code", "docs"]
+
+    def __init__(self, use_cache: bool = True):
+        # False: run every agent afresh (approved results are still stored)
+        self.use_cache = use_cache
         self.base_dir = Path.cwd()
         self.autoflow_dir = self.base_dir / ".autoflow"
-
-        # Initialize components
-        self.github = GitHubIssues()
-        self.firewall = ContextFirewall(self.autoflow_dir / "context-firewalls")
-        self.worktree = WorktreeManager(self.base_dir)
+        self.state_dir = self.autoflow_dir / "state"
+        self.webhook_secret = os.environ.get("AUTOFLOW_WEBHOOK_SECRET")
         self.checkpoint = HumanCheckpoint()
 
-        # Initialize all agents
-        self.research_agent = ResearchAgent(self.firewall)
-        self.plan_agent = PlanAgent(self.firewall)
-        self.implement_agent = ImplementAgent(self.firewall)
-        self.validate_agent = ValidateAgent(self.firewall)
+        # Issue close-outs run in the background; later phases don't read them
+        self._background: List[asyncio.Task] = []
+
+    @classmethod
+    def parse_args(cls, argv: List[str]) -> Optional["CliCommand"]:
+        """Turn CLI arguments into a command (None means print usage)"""
+        if not argv:
+            return None
+        if argv[0] == "--serve":
+            if len(argv) > 2 or (len(argv) == 2 and not argv[1].isdigit()):
+                return None
+            return CliCommand("serve", argv[1] if len(argv) == 2 else "8787")
+        if argv[0] == "--register-webhook":
+            return CliCommand("register-webhook", argv[1]) if len(argv) == 2 else None
+        if argv[0] == "--no-cache":
+            return CliCommand("run", " ".join(argv[1:]), use_cache=False) if len(argv) > 1 else None
+        return CliCommand("run", " ".join(argv))
+
+    # Components and agents are built on first use: __init__ touches neither
+    # the filesystem nor the network, and a workflow that stops at a
+    # checkpoint (or resumes at a later phase) skips what it doesn't reach
+
+    @functools.cached_property
+    def github(self) -> GitHubIssues:
+        return GitHubIssues(self.base_dir)
+
+    @functools.cached_property
+    def firewall(self) -> ContextFirewall:
+        return ContextFirewall(self.autoflow_dir / "context-firewalls")
+
+    @functools.cached_property
+    def worktree(self) -> WorktreeManager:
+        return WorktreeManager(self.base_dir)
+
+    @functools.cached_property
+    def responses(self) -> ResponseCache:
+        return ResponseCache(self.autoflow_dir / "cache" / "responses.db")
+
+    @functools.cached_property
+    def research_agent(self) -> "ResearchAgent":
+        cache_dir = self.autoflow_dir / "cache" / "research" if self.use_cache else None
+        return ResearchAgent(self.firewall, cache_dir)
+
+    @functools.cached_property
+    def plan_agent(self) -> "PlanAgent":
+        return PlanAgent(self.firewall, self.github)
+
+    @functools.cached_property
+    def implement_agent(self) -> "ImplementAgent":
+        return ImplementAgent(self.firewall)
+
+    @functools.cached_property
+    def validate_agent(self) -> "ValidateAgent":
+        return ValidateAgent(self.firewall)
 
     def run_workflow(self, task_description: str):
         """Execute complete CCPM 5-phase workflow"""
+        asyncio.run(self._run_workflow(task_description))
+
+    def resume_workflow(self, workflow_id: str, approved: bool):
+        """Continue a workflow that is waiting on a checkpoint comment"""
+        asyncio.run(self._resume_workflow(workflow_id, approved))
+
+    def handle_decision(self, issue_number: str, approved: bool) -> bool:
+        """Resume the workflow waiting on issue_number (False if none is)"""
+        for state_file in self.state_dir.glob("*.json"):
+            with open(state_file, 'r') as f:
+                state = json.load(f)
+            if state.get("issue") == issue_number:
+                self.resume_workflow(state["workflow_id"], approved)
+                return True
+        return False
+
+    async def _run_workflow(self, task_description: str):
+        """Run the phases on one event loop so checkpoints can be awaited"""
         print("\n" + "="*60)
         print("🚀 AutoFlow - Git-Native Workflow System")
         print("="*60)
         print(f"\nTask: {task_description}")
 
-        # Phase 1: Research
-        research_issue = self._phase_1_research(task_description)
-
-        # Phase 2: Plan
-        plan_issue = self._phase_2_plan(task_description, research_issue)
-
-        # Phase 3: Implement
-        implement_result = self._phase_3_implement(task_description, plan_issue)
+        state = {
+            "workflow_id": f"{_slugify(task_description, 40)}-{datetime.now().strftime('%Y%m%d-%H%M%S')}",
+            "task": task_description,
+            "phase": 0,
+        }
+        await self._advance(state)
 
-        # Phase 4: Validate
-        validate_result = self._phase_4_validate(implement_result)
+    async def _resume_workflow(self, workflow_id: str, approved: bool):
+        state_file = self._state_file(workflow_id)
+        with open(state_file, 'r') as f:
+            state = json.load(f)
 
-        # Phase 5: Integrate
-        self._phase_5_integrate(implement_result, validate_result)
+        checkpoint_type, stage = self.CHECKPOINTS[state["phase"]]
+        print(f"\n🚦 {checkpoint_type}: {'approved' if approved else 'rejected'} on issue #{state['issue']}")
 
+        if not approved:
+            print(f"❌ {stage} not approved. Stopping workflow.")
+            self._reject_phase(state)
+            state_file.unlink()
+            return
+
+        self._complete_phase(state)
+        await self._advance(state)
+
+    async def _advance(self, state: Dict[str, Any]):
+        """Run phases from state["phase"] until the workflow ends or waits on a comment"""
+        phases = (self._phase_1_research, self._phase_2_plan, self._phase_3_implement, self._phase_4_validate)
+        try:
+            while state["phase"] < len(phases):
+                checkpoint_data = await phases[state["phase"]](state)
+                checkpoint_type, stage = self.CHECKPOINTS[state["phase"]]
+                if checkpoint_data is None:
+                    print(f"❌ {stage} failed. Stopping workflow.")
+                    sys.exit(1)
+
+                if self.webhook_secret and state.get("issue"):
+                    self._suspend(state, checkpoint_type, checkpoint_data)
+                    return
+
+                # Human checkpoint
+                if not await self.checkpoint.request_approval(checkpoint_type, checkpoint_data):
+                    print(f"❌ {stage} not approved. Stopping workflow.")
+                    self._reject_phase(state)
+                    sys.exit(1)
+                self._complete_phase(state)
+
+            # Phase 5: Integrate
+            self._phase_5_integrate(state["implement"], state["validate"])
+        finally:
+            await asyncio.gather(*self._background)
+            self._background.clear()
+
+        self._state_file(state["workflow_id"]).unlink(missing_ok=True)
         print("\n✅ Workflow complete!")
 
-    def _phase_1_research(self, task_description: str) -> str:
-        """Phase 1: Research"""
+    def _complete_phase(self, state: Dict[str, Any]):
+        """Record an approved checkpoint, cache its result and close out the phase's issue"""
+        if state["phase"] == 0:
+            self._cache_research(state)
+            self._close_issue_later(state["research_issue"], f"**Research Complete**\n\n{state['research']['summary']}")
+        elif state["phase"] == 1:
+            # Only the breakdown is reused: a hit still creates this run's task issues
+            self.responses.put("plan", state["task"], {"tasks": state["plan"]["tasks"]},
+                               state["research"]["summary"])
+            self._close_issue_later(state["plan_issue"], f"**Plan Complete**\n\n{state['plan']['summary']}")
+        state["phase"] += 1
+
+    def _reject_phase(self, state: Dict[str, Any]):
+        """Forget a rejected result so the next run produces a fresh one"""
+        if state["phase"] == 0:
+            self.responses.delete("research", state["task"], self.RESEARCH_SOURCES)
+            self.research_agent.discard_cached_document(state["research"].get("document_key"))
+        elif state["phase"] == 1:
+            self.responses.delete("plan", state["task"], state["research"]["summary"])
+
+    def _cache_research(self, state: Dict[str, Any]):
+        """Store approved research with its document text (the firewall file is per run)"""
+        result = dict(state["research"])
+        try:
+            result["document"] = Path(result.pop("full_document")).read_text(encoding='utf-8')
+        except OSError:
+            return
+        self.responses.put("research", state["task"], result, self.RESEARCH_SOURCES)
+
+    def _suspend(self, state: Dict[str, Any], checkpoint_type: str, data: Dict[str, Any]):
+        """Save state and ask for the checkpoint decision on the phase issue"""
+        state_file = self._state_file(state["workflow_id"])
+        state_file.parent.mkdir(parents=True, exist_ok=True)
+        with open(state_file, 'w') as f:
+            json.dump(state, f, indent=2, default=str)
+
+        details = "\n".join(f"**{key}:** {value}" for key, value in data.items())
+        self.github.comment_issue(
+            state["issue"],
+            f"🚦 **HUMAN CHECKPOINT: {checkpoint_type}**\n\n{details}\n\n"
+            f"Reply `/approve` or `/reject` to continue workflow `{state['workflow_id']}`."
+        )
+
+        print(f"\n⏸️  Waiting for /approve or /reject on issue #{state['issue']}")
+        print(f"   Workflow state: {state_file}")
+
+    def _state_file(self, workflow_id: str) -> Path:
+        return self.state_dir / f"{workflow_id}.json"
+
+    def _close_issue_later(self, issue_number: str, comment: str):
+        """Comment on and close a phase issue from a worker thread"""
+        def close_out():
+            self.github.comment_issue(issue_number, comment)
+            self.github.close_issue(issue_number)
+        self._background.append(asyncio.create_task(asyncio.to_thread(close_out)))
+
+    async def _research(self, task_description: str, sources: List[str]) -> Dict[str, Any]:
+        """Run the research agent unless an approved result for the same request is cached"""
+        cached = self.responses.get("research", task_description, sources) if self.use_cache else None
+        if cached is None:
+            return await self.research_agent.execute(task_description, sources)
+
+        print("♻️  Reusing approved research result")
+        document = cached.pop("document")
+        cached["full_document"] = self.firewall.save_full_output("research", task_description, document)
+        return cached
+
+    def _plan(self, task_description: str, research_summary: str) -> Dict[str, Any]:
+        """Run the plan agent, reusing an approved task breakdown for the same request"""
+        cached = self.responses.get("plan", task_description, research_summary) if self.use_cache else None
+        if cached is not None:
+            print("♻️  Reusing approved task breakdown")
+        return self.plan_agent.execute(task_description, research_summary,
+                                       tasks=cached["tasks"] if cached else None)
+
+    async def _phase_1_research(self, state: Dict[str, Any]) -> Dict[str, Any]:
+        """Phase 1: Research (returns the checkpoint details)"""
+        task_description = state["task"]
         print("\n" + "="*60)
         print("📚 PHASE 1: RESEARCH")
         print("="*60)
 
-        # Create GitHub Issue
-        issue_number = self.github.create_issue(
-            title=f"[RESEARCH] {task_description}",
-            body=f"Research patterns and examples for: {task_description}",
-            labels=["phase:research", "status:in-progress"]
+        # Create GitHub Issue while the research agent runs (neither needs the other)
+        issue_number, result = await asyncio.gather(
+            asyncio.to_thread(
+                self.github.create_issue,
+                title=f"[RESEARCH] {task_description}",
+                body=f"Research patterns and examples for: {task_description}",
+                labels=["phase:research", "status:in-progress"]
+            ),
+            self._research(task_description, self.RESEARCH_SOURCES)
         )
 
         print(f"\n✅ Created issue #{issue_number}")
+        state.update(research_issue=issue_number, research=result, issue=issue_number)
 
-        # Execute research agent
-        result = self.research_agent.execute(task_description, ["kb", "code", "docs"])
-
-        # Human checkpoint
-        approved = self.checkpoint.request_approval("Research Complete", {
+        return {
             "Summary": result["summary"],
             "Findings": f"{result['findings_count']} patterns/examples found",
             "Recommendation": result["recommendation"],
             "Full Document": result["full_document"]
-        })
-
-        if not approved:
-            print("❌ Research not approved. Stopping workflow.")
-            sys.exit(1)
-
-        # Update issue
-        self.github.comment_issue(issue_number, f"**Research Complete**\n\n{result['summary']}")
-        self.github.close_issue(issue_number)
-
-        return issue_number
+        }
 
-    def _phase_2_plan(self, task_description: str, research_issue: str) -> str:
-        """Phase 2: Plan"""
+    async def _phase_2_plan(self, state: Dict[str, Any]) -> Dict[str, Any]:
+        """Phase 2: Plan (returns the checkpoint details)"""
+        task_description = state["task"]
         print("\n" + "="*60)
         print("📋 PHASE 2: PLAN")
         print("="*60)
 
-        # Create GitHub Issue
-        issue_number = self.github.create_issue(
-            title=f"[PLAN] {task_description}",
-            body=f"Create implementation plan for: {task_description}",
-            labels=["phase:plan", "status:in-progress"]
+        # The approved research summary (the plan cache is keyed on it too)
+        research_summary = state["research"]["summary"]
+
+        # Create GitHub Issue and run the plan agent side by side
+        issue_number, result = await asyncio.gather(
+            asyncio.to_thread(
+                self.github.create_issue,
+                title=f"[PLAN] {task_description}",
+                body=f"Create implementation plan for: {task_description}",
+                labels=["phase:plan", "status:in-progress"]
+            ),
+            asyncio.to_thread(self._plan, task_description, research_summary)
         )
 
         print(f"\n✅ Created issue #{issue_number}")
+        state.update(plan_issue=issue_number, plan=result, issue=issue_number)
 
-        # Get research summary (from context firewall)
-        research_summary = "Research completed successfully"  # Would load from firewall
-
-        # Execute plan agent
-        result = self.plan_agent.execute(task_description, research_summary)
-
-        # Human checkpoint
-        approved = self.checkpoint.request_approval("Plan Review", {
+        return {
             "Summary": result["summary"],
             "Tasks": f"{result['task_count']} tasks identified",
             "Estimated Time": f"{result['estimated_hours']} hours",
             "Full Document": result["full_document"]
-        })
-
-        if not approved:
-            print("❌ Plan not approved. Stopping workflow.")
-            sys.exit(1)
-
-        # Update issue
-        self.github.comment_issue(issue_number, f"**Plan Complete**\n\n{result['summary']}")
-        self.github.close_issue(issue_number)
-
-        return issue_number
+        }
 
-    def _phase_3_implement(self, task_description: str, plan_issue: str) -> Dict:
-        """Phase 3: Implement"""
+    async def _phase_3_implement(self, state: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+        """Phase 3: Implement (returns the checkpoint details, None on failure)"""
+        task_description = state["task"]
         print("\n" + "="*60)
         print("💻 PHASE 3: IMPLEMENT")
         print("="*60)
 
         # Create worktree
-        branch_name = f"implement-{task_description.lower().replace(' ', '-')}"
-        worktree_path = self.worktree.create_worktree(branch_name, plan_issue)
+        branch_name = f"implement-{_slugify(task_description)}"
+        worktree_path = self.worktree.create_worktree(branch_name, state["plan_issue"])
 
         if not worktree_path:
             print("❌ Failed to create worktree")
-            return {}
+            return None
 
         # Get plan summary (from context firewall)
         plan_summary = "Plan created successfully"  # Would load from firewall
@@ -868,51 +2052,41 @@ class AutoFlowOrchestrator:
         # Execute implementation agent in worktree
         result = self.implement_agent.execute(worktree_path, plan_summary, task_description)
 
-        # Human checkpoint
-        approved = self.checkpoint.request_approval("Code Review", {
+        state["implement"] = {
+            "branch": branch_name,
+            "worktree": str(worktree_path),
+            "commits": result["commits"]
+        }
+
+        return {
             "Summary": result["summary"],
             "Files Created": result["files_created"],
             "Commits": result["commits"],
             "Full Document": result["full_document"]
-        })
-
-        if not approved:
-            print("❌ Implementation not approved. Stopping workflow.")
-            sys.exit(1)
-
-        return {
-            "branch": branch_name,
-            "worktree": str(worktree_path),
-            "commits": result["commits"]
         }
 
-    def _phase_4_validate(self, implement_result: Dict) -> Dict:
-        """Phase 4: Validate"""
+    async def _phase_4_validate(self, state: Dict[str, Any]) -> Dict[str, Any]:
+        """Phase 4: Validate (returns the checkpoint details)"""
         print("\n" + "="*60)
         print("✅ PHASE 4: VALIDATE")
         print("="*60)
 
-        worktree_path = Path(implement_result["worktree"])
+        worktree_path = Path(state["implement"]["worktree"])
         task_description = "validation"  # Would get from context
 
         # Execute validation agent
-        result = self.validate_agent.execute(worktree_path, task_description)
+        result = await self.validate_agent.execute(worktree_path, task_description)
+
+        state["validate"] = result
 
-        # Human checkpoint
-        approved = self.checkpoint.request_approval("Validation Review", {
+        return {
             "Summary": result["summary"],
             "All Tests Passed": "✅ Yes" if result["all_passed"] else "❌ No",
             "Unit Tests": f"{result['test_results']['unit']['total']} tests, {result['test_results']['unit']['coverage']} coverage",
             "Integration Tests": f"{result['test_results']['integration']['total']} tests",
             "Security": f"{result['test_results']['security']['vulnerabilities']} vulnerabilities",
             "Full Document": result["full_document"]
-        })
-
-        if not approved:
-            print("❌ Validation not approved. Stopping workflow.")
-            sys.exit(1)
-
-        return result
+        }
 
     def _phase_5_integrate(self, implement_result: Dict, validate_result: Dict):
         """Phase 5: Integrate"""
@@ -920,10 +2094,13 @@ class AutoFlowOrchestrator:
         print("🔀 PHASE 5: INTEGRATE")
         print("="*60)
 
-        # Merge worktree to main
+        # Merge worktree to main (skip the checkout/merge if it would conflict)
         branch_name = implement_result.get("branch")
         if branch_name:
-            self.worktree.merge_worktree(branch_name)
+            if self.worktree.check_mergeable_batch([branch_name]).get(branch_name):
+                self.worktree.merge_worktree(branch_name)
+            else:
+                print(f"❌ {branch_name} does not merge cleanly into main; worktree kept for manual resolution")
 
         print("\n✅ Integration complete!")
 
@@ -934,15 +2111,32 @@ class AutoFlowOrchestrator:
 
 def main():
     """Main entry point"""
-    if len(sys.argv) < 2:
-        print("Usage: python orchestrator.py <task-description>")
+    command = AutoFlowOrchestrator.parse_args(sys.argv[1:])
+    if command is None:
+        print("Usage: python orchestrator.py [--no-cache] <task-description>")
+        print("       python orchestrator.py --serve [port]")
+        print("       python orchestrator.py --register-webhook <public-url>")
         print("Example: python orchestrator.py 'implement user authentication'")
         sys.exit(1)
 
-    task_description = " ".join(sys.argv[1:])
+    secret = os.environ.get("AUTOFLOW_WEBHOOK_SECRET")
+    if command.action != "run" and not secret:
+        print("❌ Set AUTOFLOW_WEBHOOK_SECRET to use webhook checkpoints")
+        sys.exit(1)
+
+    orchestrator = AutoFlowOrchestrator(use_cache=command.use_cache)
 
-    orchestrator = AutoFlowOrchestrator()
-    orchestrator.run_workflow(task_description)
+    if command.action == "serve":
+        WebhookReceiver(secret, orchestrator.handle_decision, int(command.argument)).serve_forever()
+    elif command.action == "register-webhook":
+        url = command.argument.rstrip('/') + WebhookReceiver.PATH
+        if orchestrator.github.create_webhook(url, secret):
+            print(f"✅ Webhook registered: {url}")
+        else:
+            print("❌ Failed to register webhook")
+            sys.exit(1)
+    else:
+        orchestrator.run_workflow(command.argument)
 
 
 if __name__ == '__main__':
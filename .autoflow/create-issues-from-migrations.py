@@ -5,63 +5,11 @@ Run this after authenticating with GitHub CLI
 """
 
 import json
-import subprocess
-from pathlib import Path
 from datetime import datetime
 
-
-def create_migration_issue(project):
-    """Create GitHub Issue from migration record"""
-
-    title = f"[MIGRATION] {project['title']}"
-    body = f"""# Migrated from Archon
-
-**Project ID**: `{project['id']}`
-**Created**: {project['created_at']}
-**Updated**: {project['updated_at']}
-
-## Description
-{project['description']}
-
-## GitHub Repo
-{project.get('github_repo', 'Not set')}
-
-## Migration Status
-- [ ] Project structure created in AutoFlow
-- [ ] Tasks migrated to GitHub Issues
-- [ ] Documents migrated to `.autoflow/` directory
-- [ ] Context firewalls set up
-- [ ] Git worktrees configured
-
-## Original Archon Data
-Saved to: `.autoflow/migrations/archon-{project['id']}.json`
-
----
-*Auto-migrated from Archon to AutoFlow*
-"""
-
-    labels = ["migration", "from-archon", "project-setup"]
-
-    cmd = [
-        '/opt/homebrew/bin/gh', 'issue', 'create',
-        '--title', title,
-        '--body', body,
-        '--label', ','.join(labels)
-    ]
-
-    try:
-        result = subprocess.run(cmd, capture_output=True, text=True,
-                              cwd="/Users/samiullah/AutoFlow")
-        if result.returncode == 0:
-            issue_url = result.stdout.strip()
-            print(f"✅ Created: {issue_url}")
-            return issue_url
-        else:
-            print(f"⚠️  Failed: {result.stderr}")
-            return None
-    except Exception as e:
-        print(f"⚠️  Error: {e}")
-        return None
+from _gh_auth import is_authenticated
+from _migration import create_migration_issues_bulk
+from _migration_log import MIGRATIONS_DIR, load_state, log_event, write_record
 
 
 def main():
@@ -73,57 +21,58 @@ def main():
     print("")
 
     # Check GitHub CLI authentication
-    try:
-        result = subprocess.run(['/opt/homebrew/bin/gh', 'auth', 'status'],
-                              capture_output=True, text=True)
-        if result.returncode != 0:
-            print("❌ GitHub CLI not authenticated")
-            print("   Run: /opt/homebrew/bin/gh auth login")
-            return
-    except Exception as e:
-        print(f"❌ Error checking GitHub auth: {e}")
+    if not is_authenticated():
+        print("❌ GitHub CLI not authenticated")
+        print("   Run: /opt/homebrew/bin/gh auth login")
         return
 
     print("✅ GitHub CLI authenticated\n")
 
-    # Find migration records
-    migrations_dir = Path("/Users/samiullah/AutoFlow/.autoflow/migrations")
-    if not migrations_dir.exists():
-        print("❌ No migrations directory found")
-        return
-
-    migration_files = list(migrations_dir.glob("archon-*.json"))
-    if not migration_files:
+    # Current state: one pass over the migration log. Record files are
+    # only opened for projects the log doesn't know yet (written before
+    # the log existed); those are imported so later runs skip them too.
+    records = load_state()
+    if MIGRATIONS_DIR.exists():
+        for migration_file in MIGRATIONS_DIR.glob("archon-*.json"):
+            project_id = migration_file.stem[len("archon-"):]
+            if project_id not in records:
+                with open(migration_file, 'r') as f:
+                    record = {"project_id": project_id, **json.load(f)}
+                log_event(record)
+                records[project_id] = record
+
+    if not records:
         print("❌ No migration records found")
         return
 
-    print(f"Found {len(migration_files)} migration records\n")
-
-    # Create issues for each migration
-    created = 0
-    for migration_file in migration_files:
-        with open(migration_file, 'r') as f:
-            record = json.load(f)
+    print(f"Found {len(records)} migration records\n")
 
+    # Collect migrations that still need an issue
+    pending = []
+    for record in records.values():
         # Skip if issue already created
         if record.get("github_issue"):
             print(f"⏭️  Skipping {record['project']['title']} (already has issue)")
             continue
 
-        print(f"\n{'='*60}")
         print(f"📦 Creating issue for: {record['project']['title']}")
-        print(f"{'='*60}\n")
+        pending.append(record)
 
-        issue_url = create_migration_issue(record['project'])
+    # Create all issues (batched when there are several)
+    issue_urls = create_migration_issues_bulk([record['project'] for record in pending])
 
+    created = 0
+    for record, issue_url in zip(pending, issue_urls):
         if issue_url:
-            # Update migration record with issue URL
-            record["github_issue"] = issue_url
-            record["issue_created_at"] = datetime.now().isoformat()
-
-            with open(migration_file, 'w') as f:
-                json.dump(record, f, indent=2)
-
+            print(f"✅ Created: {issue_url}")
+            event = {
+                "project_id": record["project_id"],
+                "github_issue": issue_url,
+                "issue_created_at": datetime.now().isoformat()
+            }
+            log_event(event)
+            record.update(event)
+            write_record(record)
             created += 1
 
     print(f"\n{'='*60}")
@@ -13,116 +13,234 @@ Uses the complete design system I built earlier:
 - anti-patterns.md (what NOT to do)
 """
 
+import functools
+import mmap
+import os
+import re
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
-from typing import Dict, Optional
+from typing import Any, Dict, List, Optional, Tuple
+
+# UI validation patterns (compiled once)
+_MAGIC_RE = re.compile(r'\[(\d+)px\]')
+_COLOR_RE = re.compile(r'#[0-9a-fA-F]{3,6}')
+_ALLOWED_SPACING = frozenset((0, 4, 8, 12, 16, 20, 24, 32, 40, 48, 64, 80, 96))
+
+DESIGN_SYSTEM_FILES = {
+    'design_tokens': 'design-tokens.ts',
+    'components_guide': 'components-guide.md',
+    'responsive_rules': 'responsive-rules.md',
+    'accessibility': 'accessibility.md',
+    'anti_patterns': 'anti-patterns.md',
+}
+
+# Section key -> what the agent finds there (listed in the prompt index)
+DESIGN_SECTIONS = {
+    'design_tokens': "DESIGN TOKENS (ONLY USE THESE): spacing, colors, typography",
+    'components_guide': "COMPONENTS GUIDE (DECISION TREE): which shadcn/ui component to use",
+    'responsive_rules': "RESPONSIVE RULES (MOBILE-FIRST): breakpoints and layout patterns",
+    'accessibility': "ACCESSIBILITY STANDARDS (WCAG 2.1 AA): keyboard, ARIA, contrast",
+    'anti_patterns': "ANTI-PATTERNS (NEVER DO THESE)",
+}
+
+# Anthropic tool definition; DesignSystemIntegration.run_ui_specialist sends it
+# and answers the calls with get_design_section
+DESIGN_SECTION_TOOL = {
+    "name": "get_design_section",
+    "description": "Read one section of the ProductionForge design system. "
+                   "Read a section before writing UI code that depends on it.",
+    "input_schema": {
+        "type": "object",
+        "properties": {
+            "section": {"type": "string", "enum": list(DESIGN_SECTIONS)}
+        },
+        "required": ["section"],
+    },
+}
+
+# Fixed prompt skeleton: the design system index comes first and never
+# changes; the task-specific base prompt is appended last
+_UI_TEMPLATE = """# CRITICAL: Design System Integration (UI Hallucination Prevention)
 
+You are implementing UI with **STRICT adherence to design system**.
 
-class DesignSystemIntegration:
-    """Integrate ProductionForge design system for UI tasks"""
+## DESIGN SYSTEM (READ ON DEMAND)
 
-    def __init__(self):
-        # Path to ProductionForge design system
-        self.design_system_path = Path(__file__).parent.parent.parent / "ProductionForge" / ".productionforge" / "design-system"
+The design system is not inlined here. Call the `get_design_section` tool
+to read a section before you rely on it:
 
-        if not self.design_system_path.exists():
-            print(f"⚠️  Design system not found at: {self.design_system_path}")
-            print("   UI hallucination prevention disabled")
-            self.enabled = False
-        else:
-            self.enabled = True
+""" + "\n".join(f"- `{key}`: {description}" for key, description in DESIGN_SECTIONS.items()) + """
 
-    def load_design_system(self) -> Dict[str, str]:
-        """Load complete design system into agent context"""
-        if not self.enabled:
-            return {}
+## VALIDATION CHECKLIST
 
-        files = {
-            'design_tokens': 'design-tokens.ts',
-            'components_guide': 'components-guide.md',
-            'responsive_rules': 'responsive-rules.md',
-            'accessibility': 'accessibility.md',
-            'anti_patterns': 'anti-patterns.md',
-        }
+Before committing UI code, verify:
+- [ ] Used design tokens (no magic numbers)
+- [ ] Used shadcn/ui components (no raw HTML)
+- [ ] Mobile responsive (375px, 768px, 1920px)
+- [ ] Accessible (keyboard nav, ARIA, contrast)
+- [ ] No hardcoded colors
+- [ ] Touch targets 44×44px minimum
+- [ ] Focus indicators visible
+- [ ] Alt text on all images
+- [ ] Labels on all inputs
 
-        design_system = {}
+**Result**: Perfect UI on first try. No rework. No hallucination.
 
-        for key, filename in files.items():
-            file_path = self.design_system_path / filename
-            if file_path.exists():
-                with open(file_path, 'r') as f:
-                    design_system[key] = f.read()
+{base_prompt}
+"""
 
-        print(f"✅ Loaded design system: {len(design_system)} files")
-        return design_system
 
-    def create_ui_specialist_prompt(self, base_prompt: str) -> str:
-        """Create UI specialist prompt with design system loaded"""
-        if not self.enabled:
-            return base_prompt
+UI_SPECIALIST_MODEL = "claude-sonnet-4-20250514"
 
-        design_system = self.load_design_system()
+# Each section only needs reading once, plus the round that writes the code
+MAX_TOOL_ROUNDS = len(DESIGN_SECTIONS) + 1
 
-        ui_prompt = f"""{base_prompt}
+# Files at least this big are decoded straight from a memory map
+_MMAP_MIN_SIZE = 64 * 1024
 
-# CRITICAL: Design System Integration (UI Hallucination Prevention)
 
-You are implementing UI with **STRICT adherence to design system**.
+def _read_text(path: Path) -> str:
+    """
+    Read a UTF-8 text file (universal newlines, like open(path, 'r'))
+
+    Large files are mapped and decoded in place, skipping the
+    intermediate bytes copy a buffered read() makes.
+    """
+    with open(path, 'rb') as f:
+        if os.fstat(f.fileno()).st_size < _MMAP_MIN_SIZE:
+            text = f.read().decode('utf-8')
+        else:
+            with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mapped:
+                text = str(mapped, 'utf-8')
 
-## DESIGN TOKENS (ONLY USE THESE)
+    if '\r' in text:
+        text = text.replace('\r\n', '\n').replace('\r', '\n')
+    return text
 
-{design_system.get('design_tokens', '')}
 
-## COMPONENTS GUIDE (DECISION TREE)
+@functools.lru_cache(maxsize=1)
+def _load_cached(path: Path, mtimes: Tuple[Optional[int], ...]) -> Tuple[Tuple[str, str], ...]:
+    """
+    Read the design system files under path
 
-{design_system.get('components_guide', '')}
+    mtimes (one per DESIGN_SYSTEM_FILES entry, None if missing) is part of
+    the cache key, so editing, adding or removing a file forces a re-read.
+    The files that exist are read in parallel.
+    """
+    present = [
+        (key, path / filename)
+        for (key, filename), mtime in zip(DESIGN_SYSTEM_FILES.items(), mtimes)
+        if mtime is not None
+    ]
 
-## RESPONSIVE RULES (MOBILE-FIRST)
+    def read(item):
+        key, file_path = item
+        return key, _read_text(file_path)
 
-{design_system.get('responsive_rules', '')}
+    design_system = ()
+    if present:
+        with ThreadPoolExecutor(max_workers=len(present)) as pool:
+            design_system = tuple(pool.map(read, present))
 
-## ACCESSIBILITY STANDARDS (WCAG 2.1 AA)
+    print(f"✅ Loaded design system: {len(design_system)} files")
+    return design_system
 
-{design_system.get('accessibility', '')}
 
-## ANTI-PATTERNS (NEVER DO THESE)
+class DesignSystemIntegration:
+    """Integrate ProductionForge design system for UI tasks"""
 
-{design_system.get('anti_patterns', '')}
+    def __init__(self):
+        # Path to ProductionForge design system
+        self.design_system_path = Path(__file__).parent.parent.parent / "ProductionForge" / ".productionforge" / "design-system"
 
-## VALIDATION CHECKLIST
+        if not self.design_system_path.exists():
+            print(f"⚠️  Design system not found at: {self.design_system_path}")
+            print("   UI hallucination prevention disabled")
+            self.enabled = False
+        else:
+            self.enabled = True
 
-Before committing UI code, verify:
-- [ ] Used design tokens (no magic numbers)
-- [ ] Used shadcn/ui components (no raw HTML)
-- [ ] Mobile responsive (375px, 768px, 1920px)
-- [ ] Accessible (keyboard nav, ARIA, contrast)
-- [ ] No hardcoded colors
-- [ ] Touch targets 44×44px minimum
-- [ ] Focus indicators visible
-- [ ] Alt text on all images
-- [ ] Labels on all inputs
+    def load_design_system(self) -> Dict[str, str]:
+        """Load complete design system into agent context"""
+        if not self.enabled:
+            return {}
 
-**Result**: Perfect UI on first try. No rework. No hallucination.
-"""
+        # One directory scan instead of a stat() per expected file
+        found = {}
+        with os.scandir(self.design_system_path) as entries:
+            for entry in entries:
+                if entry.is_file():
+                    found[entry.name] = entry.stat().st_mtime_ns
+        mtimes = tuple(found.get(filename) for filename in DESIGN_SYSTEM_FILES.values())
+
+        return dict(_load_cached(self.design_system_path, mtimes))
 
-        return ui_prompt
+    def create_ui_specialist_prompt(self, base_prompt: str) -> str:
+        """
+        Create UI specialist prompt with the design system index
+
+        Section contents are fetched through DESIGN_SECTION_TOOL, so send
+        the prompt with run_ui_specialist, which answers the tool calls.
+        """
+        if not self.enabled:
+            return base_prompt
+
+        return _UI_TEMPLATE.format_map({'base_prompt': base_prompt})
+
+    def get_design_section(self, section: str) -> str:
+        """Tool handler: contents of one design system section"""
+        if section not in DESIGN_SECTIONS:
+            return f"Unknown section '{section}'. Available: {', '.join(DESIGN_SECTIONS)}"
+
+        content = self.load_design_system().get(section)
+        if content is None:
+            return f"Section '{section}' ({DESIGN_SYSTEM_FILES[section]}) is missing from the design system"
+        return content
+
+    def run_ui_specialist(self, client, base_prompt: str, max_tokens: int = 4000) -> str:
+        """
+        Run a UI task through Claude with the design system on demand
+
+        client is an anthropic.Anthropic instance. Sections the model asks
+        for via get_design_section are answered from the cached loader
+        until it stops calling the tool; returns the final text.
+        """
+        request: Dict[str, Any] = {"model": UI_SPECIALIST_MODEL, "max_tokens": max_tokens}
+        if self.enabled:
+            request["tools"] = [DESIGN_SECTION_TOOL]
+        messages: List[Dict[str, Any]] = [
+            {"role": "user", "content": self.create_ui_specialist_prompt(base_prompt)}
+        ]
+
+        for _ in range(MAX_TOOL_ROUNDS):
+            response = client.messages.create(messages=messages, **request)
+            if response.stop_reason != "tool_use":
+                break
+
+            messages.append({"role": "assistant", "content": response.content})
+            messages.append({"role": "user", "content": [
+                {
+                    "type": "tool_result",
+                    "tool_use_id": block.id,
+                    "content": self.get_design_section(block.input.get("section", "")),
+                }
+                for block in response.content
+                if block.type == "tool_use"
+            ]})
+
+        return "".join(block.text for block in response.content if block.type == "text")
 
     def validate_ui_code(self, code: str) -> Dict[str, any]:
         """Validate UI code against design system"""
-        violations = []
-
         # Check for magic numbers
-        import re
-        magic_pattern = r'\[(\d+)px\]'
-        matches = re.findall(magic_pattern, code)
-        allowed = {'0', '4', '8', '12', '16', '20', '24', '32', '40', '48', '64', '80', '96'}
-
-        for match in matches:
-            if match not in allowed:
-                violations.append(f"Magic number: [{match}px]")
+        violations = [
+            f"Magic number: [{match}px]"
+            for match in _MAGIC_RE.findall(code)
+            if int(match) not in _ALLOWED_SPACING
+        ]
 
         # Check for hardcoded colors
-        color_pattern = r'#[0-9a-fA-F]{3,6}'
-        colors = re.findall(color_pattern, code)
+        colors = _COLOR_RE.findall(code)
         if colors:
             violations.append(f"Hardcoded colors: {', '.join(colors)}")
 
@@ -5,31 +5,98 @@ Migrate from Archon to AutoFlow
 Reads Archon projects and migrates them to AutoFlow format.
 """
 
-import json
-import subprocess
+import argparse
+import os
 from pathlib import Path
-from typing import Dict, List, Any
+from typing import Dict, List, Optional
 from datetime import datetime
 
+from _mcp_client import MCPError, MCPStdioClient
+from _migration import create_issues, map_status, task_issue
+from _migration_log import dump_json, load_json
+
+# Command that starts the Archon MCP server on stdio
+ARCHON_MCP_COMMAND = os.environ.get("ARCHON_MCP_COMMAND", "archon-mcp")
+
 
 class ArchonToAutoFlowMigration:
     """Migrate projects from Archon MCP to AutoFlow"""
 
-    def __init__(self):
+    PROJECTS_CACHE_TTL = 3600  # seconds
+
+    def __init__(self, refresh_cache: bool = False):
         self.autoflow_dir = Path.cwd() / ".autoflow"
         self.migrations_dir = self.autoflow_dir / "migrations"
         self.migrations_dir.mkdir(parents=True, exist_ok=True)
+        self.projects_cache_file = self.migrations_dir / ".archon-projects-cache.json"
+        # archon_task_id -> issue URL for every task that already has an issue
+        self.seen_file = self.migrations_dir / ".seen.json"
+        self.refresh_cache = refresh_cache
+
+        # One timestamp for every record and file written by this run
+        started = datetime.now()
+        self.migrated_at = started.isoformat()
+        self.run_stamp = started.strftime('%Y%m%d-%H%M%S')
 
     def get_archon_projects(self) -> List[Dict]:
-        """Get all projects from Archon MCP"""
+        """Get all projects from Archon MCP (cached on disk for PROJECTS_CACHE_TTL)"""
+        if not self.refresh_cache:
+            cached = self._load_cached_projects()
+            if cached is not None:
+                return cached
+
+        projects = self._fetch_archon_projects()
+        if projects:
+            dump_json({
+                "fetched_at": datetime.now().isoformat(),
+                "ttl_seconds": self.PROJECTS_CACHE_TTL,
+                "projects": projects
+            }, self.projects_cache_file, indent=False)
+        return projects
+
+    def _load_cached_projects(self) -> Optional[List[Dict]]:
+        """Projects from the cache file, or None if it is missing or stale"""
+        try:
+            cache = load_json(self.projects_cache_file.read_bytes())
+            fetched_at = datetime.fromisoformat(cache["fetched_at"])
+        except (OSError, ValueError, KeyError):
+            return None
+
+        age = (datetime.now() - fetched_at).total_seconds()
+        if age > cache.get("ttl_seconds", self.PROJECTS_CACHE_TTL):
+            return None
+        print(f"♻️  Using Archon projects cached {int(age // 60)} min ago (--refresh-cache to re-fetch)")
+        return cache["projects"]
+
+    def _fetch_archon_projects(self) -> List[Dict]:
+        """Ask Archon MCP for the project list"""
+        try:
+            with MCPStdioClient(ARCHON_MCP_COMMAND) as archon:
+                result = archon.call_tool("find_projects")
+            # find_projects answers {"success": ..., "projects": [...]}
+            if isinstance(result, dict):
+                return result.get("projects", [])
+            return result if isinstance(result, list) else []
+        except MCPError as e:
+            print(f"⚠️  Archon MCP unavailable ({e}), asking Claude instead")
+            return self._fetch_archon_projects_via_claude()
+
+    def _fetch_archon_projects_via_claude(self) -> List[Dict]:
+        """Fallback: have the model call the Archon tool for us"""
+        # Imported only here: the SDK pulls in httpx/pydantic (hundreds of ms),
+        # which cache hits and the direct MCP path never need
         try:
-            # Call Archon MCP to list projects
             import anthropic
+        except ImportError:
+            print("⚠️  Could not fetch Archon projects: the anthropic package is not installed")
+            print("   Set ARCHON_MCP_COMMAND to your Archon MCP server, or: pip install anthropic")
+            return []
 
+        try:
             client = anthropic.Anthropic()
 
             # Use MCP tool to get projects
-            response = client.messages.create(
+            with client.messages.stream(
                 model="claude-sonnet-4-20250514",
                 max_tokens=2000,
                 tools=[
@@ -46,13 +113,14 @@ class ArchonToAutoFlowMigration:
                     "role": "user",
                     "content": "List all Archon projects"
                 }]
-            )
-
-            # Extract projects from response
-            if response.content:
-                for block in response.content:
-                    if hasattr(block, 'type') and block.type == 'tool_use':
-                        return block.input
+            ) as stream:
+                # Stop at the first complete tool_use block: leaving the
+                # with-block closes the stream, skipping any trailing text
+                for event in stream:
+                    if event.type == 'content_block_stop':
+                        block = stream.current_message_snapshot.content[event.index]
+                        if block.type == 'tool_use':
+                            return block.input
 
             return []
 
@@ -72,7 +140,7 @@ class ArchonToAutoFlowMigration:
         migration_data = {
             "source": "archon",
             "archon_project_id": project_id,
-            "migrated_at": datetime.now().isoformat(),
+            "migrated_at": self.migrated_at,
             "project": {
                 "name": project_name,
                 "description": archon_project.get('description', ''),
@@ -88,7 +156,7 @@ class ArchonToAutoFlowMigration:
                 migration_data['tasks'].append({
                     "title": task.get('title', ''),
                     "description": task.get('description', ''),
-                    "status": self._map_archon_status(task.get('status', 'todo')),
+                    "status": map_status(task.get('status', 'todo')),
                     "assignee": task.get('assignee', 'User'),
                     "archon_task_id": task.get('id', '')
                 })
@@ -104,63 +172,57 @@ class ArchonToAutoFlowMigration:
                 })
 
         # Save migration data
-        migration_file = self.migrations_dir / f"archon-{project_id}-{datetime.now().strftime('%Y%m%d-%H%M%S')}.json"
-        with open(migration_file, 'w') as f:
-            json.dump(migration_data, f, indent=2)
+        migration_file = self.migrations_dir / f"archon-{project_id}-{self.run_stamp}.json"
+        dump_json(migration_data, migration_file)
 
         print(f"✅ Migration data saved: {migration_file}")
 
         return migration_data
 
-    def _map_archon_status(self, archon_status: str) -> str:
-        """Map Archon task status to AutoFlow status"""
-        mapping = {
-            "todo": "todo",
-            "doing": "in_progress",
-            "in_progress": "in_progress",
-            "review": "review",
-            "done": "completed"
-        }
-        return mapping.get(archon_status.lower(), "todo")
-
     def create_github_issues_from_migration(self, migration_data: Dict):
         """Create GitHub Issues from migrated Archon tasks"""
 
         print(f"\n📋 Creating GitHub Issues for: {migration_data['project']['name']}")
 
+        # Tasks a previous run already created issues for are not created again
+        seen = self._load_seen()
+        tasks = []
         for task in migration_data['tasks']:
-            title = f"[MIGRATED] {task['title']}"
-            body = f"""Migrated from Archon
-
-**Original Description:**
-{task['description']}
-
-**Original Status:** {task['status']}
-**Original Assignee:** {task['assignee']}
-
-**Archon Task ID:** {task['archon_task_id']}
-"""
-
-            labels = ["migrated-from-archon", f"status:{task['status']}"]
+            if task['archon_task_id'] in seen:
+                task['github_issue'] = seen[task['archon_task_id']]
+            else:
+                tasks.append(task)
+        skipped = len(migration_data['tasks']) - len(tasks)
+        if skipped:
+            print(f"⏭️  Skipping {skipped} task(s) already migrated")
+        if not tasks:
+            return
 
-            # Create GitHub Issue
-            cmd = [
-                'gh', 'issue', 'create',
-                '--title', title,
-                '--body', body,
-                '--label', ','.join(labels)
-            ]
+        issues = [
+            task_issue(task['title'], task['description'], task['status'], task['assignee'],
+                       task['archon_task_id'])
+            for task in tasks
+        ]
+        issue_urls = create_issues(issues, cwd=str(Path.cwd()))
+
+        for task, issue_url in zip(tasks, issue_urls):
+            if issue_url:
+                task['github_issue'] = issue_url
+                if task['archon_task_id']:
+                    seen[task['archon_task_id']] = issue_url
+        self._save_seen(seen)
+
+    def _load_seen(self) -> Dict[str, str]:
+        try:
+            return load_json(self.seen_file.read_bytes())
+        except (OSError, ValueError):
+            return {}
 
-            try:
-                result = subprocess.run(cmd, capture_output=True, text=True)
-                if result.returncode == 0:
-                    issue_url = result.stdout.strip()
-                    print(f"✅ Created: {issue_url}")
-                    task['github_issue'] = issue_url
-                else:
-                    print(f"⚠️  Failed to create issue: {task['title']}")
-            except Exception as e:
-                print(f"⚠️  Error creating issue: {e}")
+    def _save_seen(self, seen: Dict[str, str]):
+        # Write-then-rename: an interrupted run never leaves a truncated file
+        tmp = self.seen_file.with_suffix('.tmp')
+        dump_json(seen, tmp, indent=False)
+        tmp.replace(self.seen_file)
 
     def migrate_all_projects(self):
         """Migrate all Archon projects to AutoFlow"""
@@ -201,15 +263,14 @@ class ArchonToAutoFlowMigration:
 
         # Create migration summary
         summary = {
-            "migrated_at": datetime.now().isoformat(),
+            "migrated_at": self.migrated_at,
             "total_projects": len(archon_projects),
             "successfully_migrated": len(migrated),
             "projects": migrated
         }
 
-        summary_file = self.migrations_dir / f"migration-summary-{datetime.now().strftime('%Y%m%d-%H%M%S')}.json"
-        with open(summary_file, 'w') as f:
-            json.dump(summary, f, indent=2)
+        summary_file = self.migrations_dir / f"migration-summary-{self.run_stamp}.json"
+        dump_json(summary, summary_file)
 
         print("")
         print("="*60)
@@ -226,7 +287,12 @@ class ArchonToAutoFlowMigration:
 
 def main():
     """Main entry point"""
-    migrator = ArchonToAutoFlowMigration()
+    parser = argparse.ArgumentParser(description="Migrate Archon projects to AutoFlow")
+    parser.add_argument('--refresh-cache', action='store_true',
+                        help="re-fetch the Archon project list instead of using the cached copy")
+    args = parser.parse_args()
+
+    migrator = ArchonToAutoFlowMigration(refresh_cache=args.refresh_cache)
     migrator.migrate_all_projects()
 
 
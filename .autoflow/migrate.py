@@ -6,11 +6,14 @@ Uses direct MCP calls to fetch Archon data and create AutoFlow structure.
 """
 
 import json
-import subprocess
+import re
 import sys
 from pathlib import Path
 from datetime import datetime
 
+from _migration import create_issues, map_status, task_issue
+from _migration_log import dump_json, load_json
+
 
 def get_archon_projects():
     """Get projects via archon MCP - to be called by Claude Code"""
@@ -25,60 +28,36 @@ def get_archon_projects():
     return None
 
 
-def map_status(archon_status):
-    """Map Archon status to AutoFlow"""
-    mapping = {
-        "todo": "todo",
-        "doing": "in_progress",
-        "in_progress": "in_progress",
-        "review": "review",
-        "done": "completed"
-    }
-    return mapping.get(archon_status.lower(), "todo")
-
-
-def create_github_issue(title, description, status, assignee):
-    """Create GitHub Issue from task"""
-
-    issue_title = f"[MIGRATED] {title}"
-    issue_body = f"""Migrated from Archon
+# A complete JSON string literal (they can't span lines: newlines must be escaped)
+_JSON_STRING_RE = re.compile(r'"(?:[^"\\]|\\.)*"')
 
-{description}
 
-**Status:** {status}
-**Assignee:** {assignee}
-"""
-
-    labels = ["migrated-from-archon", f"status:{status}"]
+def read_json_value(first_line, read_line=input):
+    """
+    Read one JSON value pasted over one or more lines
 
-    cmd = [
-        '/opt/homebrew/bin/gh', 'issue', 'create',
-        '--title', issue_title,
-        '--body', issue_body,
-        '--label', ','.join(labels)
-    ]
-
-    try:
-        result = subprocess.run(cmd, capture_output=True, text=True)
-        if result.returncode == 0:
-            issue_url = result.stdout.strip()
-            print(f"✅ Created: {issue_url}")
-            return issue_url
-        else:
-            print(f"⚠️  Failed: {result.stderr}")
-            return None
-    except Exception as e:
-        print(f"⚠️  Error: {e}")
-        return None
+    Stops as soon as the top-level value's brackets balance, so blank
+    lines inside the JSON are fine and stdin is left at the next prompt.
+    """
+    lines = []
+    depth = 0
+    line = first_line
+    while True:
+        lines.append(line)
+        structure = _JSON_STRING_RE.sub('', line)
+        depth += structure.count('{') + structure.count('[') - structure.count('}') - structure.count(']')
+        if depth <= 0:
+            break
+        try:
+            line = read_line()
+        except EOFError:
+            break
 
+    return '\n'.join(lines)
 
-def migrate_project_interactive():
-    """Interactive migration"""
 
-    print("="*60)
-    print("🔄 Archon → AutoFlow Migration (Interactive)")
-    print("="*60)
-    print("")
+def read_pasted_json():
+    """Walk the user through exporting from Archon and read the pasted JSON (None if skipped)"""
 
     print("Step 1: Get your Archon project data")
     print("")
@@ -101,23 +80,40 @@ def migrate_project_interactive():
     print("Paste your Archon project JSON (or 'skip' to skip):")
     print("")
 
-    try:
-        lines = []
-        while True:
-            line = input()
-            if line.strip().lower() == 'skip':
-                print("Skipping interactive mode.")
-                return
-            if line.strip() == '':
-                break
-            lines.append(line)
+    first_line = input()
+    if first_line.strip().lower() == 'skip':
+        print("Skipping interactive mode.")
+        return None
+    if first_line.strip() == '':
+        print("No data entered.")
+        return None
+
+    return read_json_value(first_line)
 
-        if not lines:
-            print("No data entered.")
-            return
 
-        project_json = '\n'.join(lines)
-        project_data = json.loads(project_json)
+def migrate_project_interactive(json_file=None):
+    """Interactive migration (json_file: read the project JSON from that Path instead of a paste)"""
+
+    # One timestamp for everything this run writes
+    now = datetime.now()
+    migrated_at = now.isoformat()
+    stamp = now.strftime('%Y%m%d-%H%M%S')
+
+    print("="*60)
+    print("🔄 Archon → AutoFlow Migration (Interactive)")
+    print("="*60)
+    print("")
+
+    try:
+        if json_file is not None:
+            # Whole document in one read; stdin stays free for the prompt below
+            print(f"Reading Archon project JSON from {json_file}")
+            project_json = json_file.read_bytes()
+        else:
+            project_json = read_pasted_json()
+            if project_json is None:
+                return
+        project_data = load_json(project_json)
 
         # Extract project info
         project_name = project_data.get('title', 'Migrated Project')
@@ -130,29 +126,35 @@ def migrate_project_interactive():
             print(f"Found {len(tasks)} tasks")
             print("")
 
-            response = input("Create GitHub Issues for these tasks? [yes/no]: ")
-            if response.lower() in ['yes', 'y']:
-                for task in tasks:
-                    title = task.get('title', 'Untitled')
-                    description = task.get('description', '')
-                    status = map_status(task.get('status', 'todo'))
-                    assignee = task.get('assignee', 'User')
-
-                    create_github_issue(title, description, status, assignee)
+            # Re-ask on an empty answer (e.g. a stray Enter after the paste)
+            response = ''
+            while not response:
+                response = input("Create GitHub Issues for these tasks? [yes/no]: ").strip()
+            if response.lower() in ['yes', 'y'] and tasks:
+                issues = [
+                    task_issue(
+                        task.get('title', 'Untitled'),
+                        task.get('description', ''),
+                        map_status(task.get('status', 'todo')),
+                        task.get('assignee', 'User'),
+                        task.get('id')
+                    )
+                    for task in tasks
+                ]
+                create_issues(issues, cwd=str(Path.cwd()))
 
         # Save migration record
         migrations_dir = Path.cwd() / ".autoflow" / "migrations"
         migrations_dir.mkdir(parents=True, exist_ok=True)
 
         migration_record = {
-            "migrated_at": datetime.now().isoformat(),
+            "migrated_at": migrated_at,
             "source": "archon",
             "project": project_data
         }
 
-        migration_file = migrations_dir / f"archon-migration-{datetime.now().strftime('%Y%m%d-%H%M%S')}.json"
-        with open(migration_file, 'w') as f:
-            json.dump(migration_record, f, indent=2)
+        migration_file = migrations_dir / f"archon-migration-{stamp}.json"
+        dump_json(migration_record, migration_file)
 
         print("")
         print(f"✅ Migration complete!")
@@ -176,6 +178,7 @@ Archon → AutoFlow Migration Tool
 
 Usage:
   python3 .autoflow/migrate.py              # Interactive mode
+  python3 .autoflow/migrate.py project.json # Read the project JSON from a file
 
 Interactive Mode:
   1. Run mcp__archon__find_projects() in Claude Code
@@ -195,7 +198,10 @@ new GitHub Issues in your AutoFlow project.
 """)
         return
 
-    migrate_project_interactive()
+    if len(sys.argv) > 1:
+        migrate_project_interactive(Path(sys.argv[1]))
+    else:
+        migrate_project_interactive()
 
 
 if __name__ == '__main__':
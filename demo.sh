@@ -21,7 +21,7 @@ echo ""
 
 # Check Python
 if ! command -v python3 &> /dev/null; then
-    echo "❌ Python 3 not found. Please install Python 3.8+"
+    echo "❌ Python 3 not found. Please install Python 3.9+"
     exit 1
 fi
 echo "✅ Python: $(python3 --version)"
@@ -30,7 +30,7 @@ cd "$TARGET_DIR"
 echo "📁 Creating AutoFlow directory structure..."
 mkdir -p .autoflow/agents
 mkdir -p .autoflow/context-firewalls
-mkdir -p .autoflow/resources
+mkdir -p .autoflow/resources/content
 mkdir -p .autoflow/hooks
 mkdir -p .github/ISSUE_TEMPLATE
 mkdir -p scripts
@@ -47,7 +47,8 @@ echo "✓ orchestrator.py"
 
 # Copy MCP server
 cp "$AUTOFLOW_SOURCE/.autoflow/resources/mcp-server.py" .autoflow/resources/
-echo "✓ mcp-server.py"
+cp "$AUTOFLOW_SOURCE/.autoflow/resources/content/"*.md .autoflow/resources/content/
+echo "✓ mcp-server.py (+ resource content)"
 
 # Copy PreCompact hook
 cp "$AUTOFLOW_SOURCE/.autoflow/hooks/pre-compact" .autoflow/hooks/
@@ -81,7 +82,7 @@ echo ""
 echo "📖 Next steps:"
 echo ""
 echo "1. Ensure prerequisites:"
-echo "   - Python 3.8+"
+echo "   - Python 3.9+"
 echo "   - Git 2.25+ (worktree support)"
 echo "   - GitHub CLI (gh) installed and authenticated"
 echo ""